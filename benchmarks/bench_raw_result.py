@@ -0,0 +1,80 @@
+"""
+Per-call overhead of the raw RateRecord result compared with the
+DataFrame result.
+
+The API is replaced by a session serving a prepared response, so the
+timings are those of parsing the response and building the result.
+
+    python benchmarks/bench_raw_result.py
+
+The package is imported from the checkout holding the script, so it
+does not need to be installed.
+"""
+import os
+import sys
+import timeit
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixerio_for_pdr import FixerClient, FixerForexReader, MemoryCache
+
+RESPONSE = {
+    "success": True,
+    "timestamp": 1620189484,
+    "historical": True,
+    "base": "EUR",
+    "date": "2021-05-04",
+    "rates": {"AUD": 1.555723, "CAD": 1.478034, "GBP": 0.865363, "USD": 1.202053},
+}
+
+
+class PreparedResponse(object):
+    status_code = 200
+
+    def json(self):
+        return dict(RESPONSE)
+
+
+class PreparedSession(requests.Session):
+    def get(self, url, params=None, timeout=None, headers=None):
+        return PreparedResponse()
+
+
+def main(number=2000):
+    session = PreparedSession()
+    client = FixerClient(api_key="benchmark", session=session)
+    cached = FixerClient(api_key="benchmark", session=session, cache=MemoryCache())
+    cases = [
+        (
+            "reader DataFrame",
+            lambda: FixerForexReader(
+                symbols="USD", start="2021-05-04", api_key="benchmark", session=session
+            ).read(),
+        ),
+        (
+            "reader raw",
+            lambda: FixerForexReader(
+                symbols="USD",
+                start="2021-05-04",
+                api_key="benchmark",
+                session=session,
+                raw=True,
+            ).read(),
+        ),
+        ("client DataFrame", lambda: client.get_rates("2021-05-04", "USD")),
+        ("client raw", lambda: client.get_rates("2021-05-04", "USD", raw=True)),
+        ("cached client DataFrame", lambda: cached.get_rates("2021-05-04", "USD")),
+        (
+            "cached client raw",
+            lambda: cached.get_rates("2021-05-04", "USD", raw=True),
+        ),
+    ]
+    for name, call in cases:
+        seconds = min(timeit.repeat(call, number=number, repeat=3)) / number
+        print("{:<24} {:8.1f} us per call".format(name, seconds * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -37,6 +37,27 @@ class Fixer(_BaseReader):
         Fixer.io API access key
         If not provided the environment variable
         FIXERIO_API_KEY is read. The API key is *mandatory*.
+    cache : CacheBackend, optional
+        Cache of API responses, which may be shared between readers,
+        processes or nodes. Rates of past days never change and are
+        cached without expiry.
+    cache_ttl : float, default 3600
+        Time, in seconds, to cache the rates of the current UTC day.
+    cassette : Cassette, optional
+        Cassette recording the responses, or replaying them without
+        using the network.
+    deadline : float, optional
+        Time, in seconds, allowed for each request including its retries
+        and parsing. When it is exceeded the freshest cached rates of the
+        stale_days previous days are returned, flagged as stale, or
+        DeadlineExceeded is raised.
+    stale_days : int, default 7
+        Number of previous days searched in the cache when the deadline
+        is exceeded.
+    transport : Transport, optional
+        Transport sending the requests instead of the session, e.g. an
+        HTTP2Transport shared by many readers. It is not closed by the
+        reader.
 
     Notes
     -----
@@ -55,6 +76,12 @@ class Fixer(_BaseReader):
         pause=0.1,
         session=None,
         api_key=None,
+        cache=None,
+        cache_ttl=3600,
+        cassette=None,
+        deadline=None,
+        stale_days=7,
+        transport=None,
     ):
         if start is None:
             # Force date to UTC today when start is None
@@ -79,6 +106,14 @@ class Fixer(_BaseReader):
                 environment varible FIXERIO_API_KEY"""
             )
         self.api_key = api_key
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.cassette = cassette
+        self.deadline = deadline
+        self.stale_days = stale_days
+        self.transport = transport
+        self._deadline = None
+        self._stale = (None, None)
 
     @property
     def url(self):
@@ -99,11 +134,114 @@ class Fixer(_BaseReader):
         """Key of data returned fron Fixer.io endpoint"""
         raise NotImplementedError
 
+    def _get_response(self, url, params=None, headers=None):
+        """send raw HTTP request, or replay it from the cassette"""
+        if self._deadline is None and self.transport is None:
+            get = super(Fixer, self)._get_response
+
+            def fetch():
+                return get(url, params=params, headers=headers)
+
+        else:
+            http = self.session if self.transport is None else self.transport
+
+            def fetch():
+                return get_with_retries(
+                    lambda timeout: http.get(
+                        url,
+                        params=params,
+                        headers=headers or self.headers,
+                        timeout=timeout,
+                    ),
+                    url,
+                    self.timeout,
+                    self.retry_count,
+                    self.pause,
+                    self._deadline,
+                )
+
+        if self.cassette is None:
+            return fetch()
+        return self.cassette.get_response(url, params, fetch)
+
+    def _read_one_data(self, url, params):
+        """read one data from specified URL, within the deadline"""
+        if self.deadline is None:
+            return self._read_response(url, params)
+        self._deadline = Deadline(self.deadline)
+        try:
+            return self._read_response(url, params)
+        except DeadlineExceeded:
+            day, out = self._stale
+            if out is None:
+                raise
+            return self._read_stale(day, out)
+        finally:
+            self._deadline = None
+            self._stale = (None, None)
+
+    def _read_response(self, url, params):
+        """read one data from specified URL, or from the cache"""
+        if self.cache is None and self._deadline is None:
+            return super(Fixer, self)._read_one_data(url, params)
+        if self.cache is not None:
+            key = cache_key(url, params)
+            stale = () if self._deadline is None else self._stale_keys(params)
+            cached, self._stale = read_cached(self.cache, key, self._deadline, stale)
+            if cached is not None:
+                return self._read_lines(cached)
+        out = self._get_response(url, params=params).json()
+        if self.cache is not None and is_cacheable(out):
+            self.cache.set(
+                key,
+                dumps(out),
+                response_ttl(out, self.cache_ttl),
+                None if self._deadline is None else self._deadline.remaining(),
+            )
+        if self._deadline is not None:
+            self._deadline.check(url)
+        return self._read_lines(out)
+
+    def _stale_keys(self, params):
+        """
+        Date and cache key of the cached responses which may be returned
+        when the deadline is exceeded, freshest first.
+        """
+        return []
+
+    def _read_stale(self, day, out):
+        """Data of the cached response out of day, flagged as stale"""
+        raise NotImplementedError
+
     def _read_lines(self, out):
         raise NotImplementedError
 
 
-from .forex import FixerForexReader
+from .cache import (
+    CacheBackend,
+    MemoryCache,
+    FileCache,
+    MemcachedCache,
+    dumps,
+    loads,
+    decode_cached,
+    load_cached,
+    is_cacheable,
+    cache_key,
+    response_ttl,
+)
+from .cassette import Cassette, RecordedResponse
+from .record import RateRecord
+from .deadline import Deadline, DeadlineExceeded, get_with_retries, read_cached
+from .transport import Transport, RequestsTransport, HTTP2Transport, http2_transport
+from .forex import FixerForexReader, FixerTimeseriesReader
+from .publishing import PublishingCalendar
+from .batch import Lookup, BatchPlan, plan_batch, execute_plan, read_batch
+from .store import RateStore
+from .delta import DeltaHistory
+from .lazy import LazyRateFrame
+from .analytics import RateHistory
+from .client import FixerClient, RateLimiter
 
 # Monkey patch pandas datareader as it does appear to support plugin feed extensions
 def get_exchange_rate_fixerio(*args, **kwargs):
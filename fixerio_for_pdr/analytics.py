@@ -0,0 +1,150 @@
+"""
+Fluctuation and aggregation of rates held in a local RateStore.
+"""
+import numpy as np
+import pandas as pd
+
+from .batch import Lookup, read_batch
+
+
+class RateHistory(object):
+    """
+    Vectorized analytics over the rate history of a RateStore.
+
+    Dates missing from the store, or missing any of the requested
+    currencies, are fetched on demand, all in one batch, and written to
+    the store so later queries are answered locally.
+
+    Parameters
+    ----------
+    store : RateStore
+        The local rate store
+    base : str, default EUR
+        The base currency code
+    fetch : bool, default True
+        Fetch missing dates from Fixer.io. When False only stored rates
+        are used.
+    api_key : str, optional
+        Fixer.io API key . If not provided, the environment variable
+        FIXERIO_API_KEY is read.
+    **batch_kwargs
+        Additional keyword arguments passed to read_batch
+    """
+
+    def __init__(self, store, base="EUR", fetch=True, api_key=None, **batch_kwargs):
+        self.store = store
+        self.base = base
+        self.fetch = fetch
+        self.api_key = api_key
+        self.batch_kwargs = batch_kwargs
+
+    def _fetch(self, days):
+        """
+        Fetch all currencies for the days, in one batch, and store them.
+        """
+        if not self.fetch or not days:
+            return
+        frames = read_batch(
+            [Lookup(day, self.base) for day in days],
+            api_key=self.api_key,
+            **self.batch_kwargs
+        )
+        for day, df in zip(days, frames):
+            self.store.write(
+                self.base,
+                day,
+                dict(zip(df.index, df["ExRate"])),
+                synthesized=df.attrs.get("synthesized", False),
+            )
+
+    def rates(self, start, end, symbols=None):
+        """
+        Daily rates between start and end inclusive.
+
+        Returns
+        -------
+        DataFrame
+            Rates indexed by date with a column per currency.
+        """
+        self._fetch(self.store.missing_dates(start, end, self.base, symbols))
+        return self.store.read(self.base, start, end, symbols)
+
+    def change(self, start_date, end_date, symbols=None):
+        """
+        Change of each currency between two dates, as returned by the
+        Fixer.io fluctuation endpoint.
+
+        Returns
+        -------
+        DataFrame
+            Indexed by currency, with the start_rate, end_rate, change
+            and change_pct columns.
+        """
+        start_date = pd.Timestamp(start_date)
+        end_date = pd.Timestamp(end_date)
+        self._fetch(
+            self.store.missing_dates(start_date, start_date, self.base, symbols)
+            + self.store.missing_dates(end_date, end_date, self.base, symbols)
+        )
+        start_rate = self.store.read(self.base, start_date, start_date, symbols)
+        end_rate = self.store.read(self.base, end_date, end_date, symbols)
+        df = pd.DataFrame(
+            {
+                "start_rate": start_rate.reindex([start_date]).iloc[0],
+                "end_rate": end_rate.reindex([end_date]).iloc[0],
+            }
+        )
+        df["change"] = df["end_rate"] - df["start_rate"]
+        df["change_pct"] = df["change"] / df["start_rate"] * 100
+        return df.sort_index()
+
+    def resample(self, rule, start, end, symbols=None, how="mean"):
+        """
+        Resample the daily rates.
+
+        Parameters
+        ----------
+        rule : str
+            Pandas offset alias of the target frequency, e.g. "M" or "W"
+        start, end : string, date, datetime, Timestamp
+            First and last dates of the daily rates, inclusive
+        symbols : str, array-like object, optional
+            Currency codes, all stored currencies if not provided
+        how : {"mean", "min", "max", "ohlc"}, default "mean"
+            Aggregation of each period. "ohlc" returns the open, high,
+            low and close of each currency.
+
+        Returns
+        -------
+        DataFrame
+        """
+        if how not in ("mean", "min", "max", "ohlc"):
+            raise ValueError("how must be one of mean, min, max or ohlc")
+        resampler = self.rates(start, end, symbols).resample(rule)
+        return getattr(resampler, how)()
+
+    def volatility(self, window, start, end, symbols=None, periods=None):
+        """
+        Rolling volatility, the standard deviation of daily log returns,
+        of each currency.
+
+        Parameters
+        ----------
+        window : int
+            Number of daily returns in each rolling window
+        start, end : string, date, datetime, Timestamp
+            First and last dates of the daily rates, inclusive
+        symbols : str, array-like object, optional
+            Currency codes, all stored currencies if not provided
+        periods : int, optional
+            Annualize with this number of periods per year, e.g. 365
+
+        Returns
+        -------
+        DataFrame
+        """
+        returns = np.log(self.rates(start, end, symbols)).diff()
+        volatility = returns.rolling(window).std()
+        if periods:
+            volatility *= np.sqrt(periods)
+        return volatility
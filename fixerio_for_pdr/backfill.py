@@ -0,0 +1,367 @@
+"""
+Resumable parallel backfill of daily Fixer.io rates into a RateStore.
+
+Run as the ``fixerio-backfill`` console script, for example::
+
+    fixerio-backfill 2011-01-01 2020-12-31 --store rates.sqlite --workers 4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import timedelta
+
+import pandas as pd
+import requests
+from pandas_datareader._utils import RemoteDataError
+
+from .forex import FixerForexReader
+from .publishing import PublishingCalendar
+from .store import RateStore
+
+# Per process state set up by _init_worker
+_worker = {}
+
+
+def partition_dates(start, end, partition_days=30):
+    """
+    Split the dates between start and end inclusive into consecutive
+    partitions of at most partition_days days.
+
+    Returns
+    -------
+    list of (date, date)
+        First and last date of each partition
+    """
+    start = pd.Timestamp(start).date()
+    end = pd.Timestamp(end).date()
+    if start > end:
+        raise ValueError("start must be an earlier date than end")
+    partitions = []
+    while start <= end:
+        last = min(start + timedelta(days=partition_days - 1), end)
+        partitions.append((start, last))
+        start = last + timedelta(days=1)
+    return partitions
+
+
+def _partition_key(partition, base=None, symbols=None):
+    key = "{}:{}".format(partition[0].isoformat(), partition[1].isoformat())
+    if (base or "EUR") != "EUR" or symbols:
+        # Keys of EUR rates of all currencies keep the format of earlier
+        # checkpoints
+        key += ":{}:{}".format(base or "EUR", ",".join(sorted(symbols or ())))
+    return key
+
+
+class Checkpoint(object):
+    """
+    JSON file recording the partitions already backfilled, for each base
+    and set of currencies backfilled into the store.
+
+    Parameters
+    ----------
+    path : str
+        Path of the checkpoint file, created on the first update.
+    base : str, optional
+        The base currency code of the partitions
+    symbols : array-like object, optional
+        Currency codes of the partitions, all if not provided
+    """
+
+    def __init__(self, path, base=None, symbols=None):
+        self.path = path
+        self.base = base
+        self.symbols = symbols
+        self.done = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                self.done = set(json.load(f)["done"])
+
+    def _key(self, partition):
+        return _partition_key(partition, self.base, self.symbols)
+
+    def is_done(self, partition):
+        """True if the partition has been backfilled"""
+        return self._key(partition) in self.done
+
+    def mark_done(self, partition):
+        """Record the partition as backfilled"""
+        self.done.add(self._key(partition))
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"done": sorted(self.done)}, f)
+        # Replace atomically so an interrupted run never leaves a partial file
+        os.replace(tmp_path, self.path)
+
+
+def _init_worker(store_path, api_key, retry_count, pause, calendar=None):
+    """
+    Create the pooled session and store reused by every partition run in
+    this worker process. The worker's copy of the calendar keeps learning
+    across its partitions.
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    _worker.update(
+        session=session,
+        store=RateStore(store_path),
+        api_key=api_key,
+        retry_count=retry_count,
+        pause=pause,
+        calendar=calendar,
+    )
+
+
+def _stored_rates(store, base, day, symbols):
+    """Stored rates of one day, None if not stored"""
+    if store.missing_dates(day, day, base, symbols):
+        return None
+    df = store.read(base, day, day, symbols)
+    return df.iloc[0].dropna().to_dict() if len(df) else {}
+
+
+def _backfill_partition(partition, base, symbols):
+    """
+    Fetch and store the dates of a partition that are not yet stored.
+
+    With a calendar, days without published rates are stored as
+    synthesized copies of the latest publishing day, when its rates are
+    known, instead of being fetched.
+
+    Returns
+    -------
+    (partition, int)
+        The partition and the number of dates fetched
+
+    Raises
+    ------
+    RemoteDataError
+        If the rates of a date are returned in another base than base
+    """
+    store = _worker["store"]
+    calendar = _worker.get("calendar")
+    store_base = base or "EUR"
+    known = {}
+    fetched = 0
+    for day in store.missing_dates(partition[0], partition[1], store_base, symbols):
+        source = day if calendar is None else calendar.source_date(day)
+        if source != day:
+            if source not in known:
+                known[source] = _stored_rates(store, store_base, source, symbols)
+            if known[source] is not None:
+                known[day] = known[source]
+                store.write(store_base, day, known[day], synthesized=True)
+                continue
+        reader = FixerForexReader(
+            base_currency=base,
+            symbols=symbols,
+            start=day,
+            retry_count=_worker["retry_count"],
+            pause=_worker["pause"],
+            session=_worker["session"],
+            api_key=_worker["api_key"],
+        )
+        out = reader._get_response(reader.url, params=reader.params).json()
+        df = reader._read_lines(out)
+        if out.get("base", store_base) != store_base:
+            # Stored under another base, the day would be fetched again on
+            # every resume
+            raise RemoteDataError(
+                "Rates of {} returned in base {} instead of {}".format(
+                    day, out["base"], store_base
+                )
+            )
+        known[day] = dict(zip(df.index, df["ExRate"]))
+        store.write(
+            store_base,
+            day,
+            known[day],
+            timestamp=out.get("timestamp"),
+        )
+        if calendar is not None:
+            calendar.observe(
+                day,
+                known[day],
+                out.get("timestamp"),
+                known.get(day - timedelta(days=1)),
+            )
+        fetched += 1
+    return partition, fetched
+
+
+def _print_progress(done, total, fetched, elapsed):
+    sys.stderr.write(
+        "{}/{} partitions, {} dates fetched, {:.1f} dates/s\n".format(
+            done, total, fetched, fetched / elapsed if elapsed else 0.0
+        )
+    )
+
+
+def backfill(
+    start,
+    end,
+    store_path,
+    checkpoint_path=None,
+    base=None,
+    symbols=None,
+    workers=None,
+    partition_days=30,
+    api_key=None,
+    retry_count=3,
+    pause=0.1,
+    progress=_print_progress,
+    calendar=None,
+):
+    """
+    Backfill the daily rates between start and end into a RateStore,
+    using a pool of worker processes.
+
+    Partitions recorded in the checkpoint file are skipped, and dates
+    already in the store are not fetched again, so an interrupted run
+    resumes where it stopped.
+
+    Parameters
+    ----------
+    start, end : string, date, datetime, Timestamp
+        First and last dates to backfill, inclusive
+    store_path : str
+        Path of the RateStore database
+    checkpoint_path : str, optional
+        Path of the checkpoint file, defaults to store_path + ".checkpoint"
+    base : str, optional
+        The base currency code
+    symbols : str, array-like object, optional
+        Currency codes to backfill, all if not provided
+    workers : int, optional
+        Number of worker processes, defaults to the number of CPUs
+    partition_days : int, default 30
+        Number of days in each partition
+    api_key : str, optional
+        Fixer.io API key . If not provided, the environment variable
+        FIXERIO_API_KEY is read. The API key is *mandatory*.
+    retry_count : int, default 3
+        Number of times to retry each request.
+    pause : float, default 0.1
+        Time, in seconds, of the pause between retries.
+    progress : callable, optional
+        Called as progress(done, total, fetched, elapsed) after each
+        partition. Defaults to printing a line to stderr.
+    calendar : PublishingCalendar, optional
+        Calendar of the days on which rates are published. Other days
+        are stored as synthesized copies of the latest publishing day
+        instead of being fetched.
+
+    Returns
+    -------
+    int
+        Number of dates fetched
+    """
+    if api_key is None:
+        api_key = os.getenv("FIXERIO_API_KEY")
+    if not api_key:
+        raise ValueError(
+            """The Fixer.io API key must be provided
+            either as the api_key variable or as the
+            environment varible FIXERIO_API_KEY"""
+        )
+    if isinstance(symbols, str):
+        symbols = [symbols]
+    checkpoint = Checkpoint(
+        checkpoint_path or store_path + ".checkpoint", base, symbols
+    )
+    # Create the database before the workers race to do so
+    RateStore(store_path).close()
+
+    partitions = partition_dates(start, end, partition_days)
+    pending = [p for p in partitions if not checkpoint.is_done(p)]
+    done = len(partitions) - len(pending)
+    fetched = 0
+    started = time.time()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(store_path, api_key, retry_count, pause, calendar),
+    ) as executor:
+        futures = [
+            executor.submit(_backfill_partition, partition, base, symbols)
+            for partition in pending
+        ]
+        for future in as_completed(futures):
+            partition, count = future.result()
+            checkpoint.mark_done(partition)
+            done += 1
+            fetched += count
+            if progress is not None:
+                progress(done, len(partitions), fetched, time.time() - started)
+    return fetched
+
+
+def main(argv=None):
+    """Entry point of the fixerio-backfill console script"""
+    parser = argparse.ArgumentParser(
+        prog="fixerio-backfill",
+        description="Backfill daily Fixer.io rates into a local rate store.",
+    )
+    parser.add_argument("start", help="first date to backfill, e.g. 2011-01-01")
+    parser.add_argument("end", help="last date to backfill, inclusive")
+    parser.add_argument(
+        "--store", default="fixerio_rates.sqlite", help="rate store database path"
+    )
+    parser.add_argument(
+        "--checkpoint", help="checkpoint file path, defaults to STORE.checkpoint"
+    )
+    parser.add_argument("--base", help="base currency code")
+    parser.add_argument("--symbols", help="comma separated currency codes")
+    parser.add_argument("--workers", type=int, help="number of worker processes")
+    parser.add_argument(
+        "--partition-days", type=int, default=30, help="days per partition"
+    )
+    parser.add_argument("--retry-count", type=int, default=3)
+    parser.add_argument("--pause", type=float, default=0.1)
+    parser.add_argument(
+        "--calendar",
+        choices=["none", "learn", "weekdays"],
+        default="none",
+        help="skip days without published rates, learned from the responses "
+        "or all weekends",
+    )
+    args = parser.parse_args(argv)
+    calendar = None
+    if args.calendar == "learn":
+        calendar = PublishingCalendar()
+    elif args.calendar == "weekdays":
+        calendar = PublishingCalendar(weekmask="Mon Tue Wed Thu Fri")
+
+    started = time.time()
+    try:
+        fetched = backfill(
+            args.start,
+            args.end,
+            args.store,
+            checkpoint_path=args.checkpoint,
+            base=args.base,
+            symbols=args.symbols.split(",") if args.symbols else None,
+            workers=args.workers,
+            partition_days=args.partition_days,
+            retry_count=args.retry_count,
+            pause=args.pause,
+            calendar=calendar,
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
+    except RemoteDataError as exc:
+        sys.stderr.write("Backfill interrupted, rerun to resume: {}\n".format(exc))
+        return 1
+    sys.stderr.write(
+        "Fetched {} dates in {:.1f}s\n".format(fetched, time.time() - started)
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
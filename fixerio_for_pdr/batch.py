@@ -0,0 +1,451 @@
+"""
+Plan and run many Fixer.io rate lookups with the fewest API calls.
+"""
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import pandas as pd
+from pandas_datareader._utils import RemoteDataError, _init_session
+
+from .forex import FixerForexReader, FixerTimeseriesReader
+
+EURO = "EUR"
+
+# Longest range, in days, accepted by the Fixer.io timeseries endpoint
+MAX_TIMESERIES_DAYS = 365
+
+# Quota cost of one call to each endpoint
+DEFAULT_CALL_COSTS = {"historical": 1, "timeseries": 1}
+
+Lookup = namedtuple("Lookup", ["date", "base", "symbols"])
+Lookup.__new__.__defaults__ = (None, None)
+Lookup.__doc__ = """
+A single rate lookup.
+
+Parameters
+----------
+date : string, date, datetime, Timestamp
+    UTC date of the rates
+base : str, optional
+    The base currency code, EUR if not provided
+symbols : str, array-like object, optional
+    A single currency code or list of the currency codes. All
+    currencies are returned if not provided.
+"""
+
+PlannedCall = namedtuple(
+    "PlannedCall", ["function", "start", "end", "base", "symbols", "dates"]
+)
+PlannedCall.__doc__ = """
+A single Fixer.io API call of a batch plan.
+
+``function`` is either ``historical`` or ``timeseries``, ``symbols`` is
+the sorted tuple of currency codes requested, or None for all currencies,
+and ``dates`` are the lookup dates served by the call.
+"""
+
+
+class BatchPlan(object):
+    """
+    The API calls required to answer a list of lookups.
+
+    Parameters
+    ----------
+    lookups : list of Lookup
+        The normalized lookups, in the order given by the caller
+    calls : list of PlannedCall
+        API calls that together answer all the lookups
+    cross_rates : bool
+        True when non-EUR bases are derived from EUR rates
+    call_costs : dict
+        Quota cost of one call to each endpoint
+    fetch_dates : list of date, optional
+        Date whose rates answer each lookup, the lookup date if not
+        provided
+    calendar : PublishingCalendar, optional
+        Calendar learning from the rates fetched
+    """
+
+    def __init__(
+        self, lookups, calls, cross_rates, call_costs, fetch_dates=None, calendar=None
+    ):
+        self.lookups = lookups
+        self.calls = calls
+        self.cross_rates = cross_rates
+        self.call_costs = call_costs
+        if fetch_dates is None:
+            fetch_dates = [lookup.date for lookup in lookups]
+        self.fetch_dates = fetch_dates
+        self.calendar = calendar
+
+    @property
+    def call_count(self):
+        """Number of API calls in the plan"""
+        return len(self.calls)
+
+    @property
+    def estimated_cost(self):
+        """Quota cost of running the plan"""
+        return sum(self.call_costs[call.function] for call in self.calls)
+
+    def __repr__(self):
+        return "<BatchPlan lookups={} calls={} estimated_cost={}>".format(
+            len(self.lookups), self.call_count, self.estimated_cost
+        )
+
+
+def _normalize_lookup(lookup):
+    """
+    Return lookup with a date, an upper case base and a tuple of symbols.
+    """
+    if not isinstance(lookup, Lookup):
+        lookup = Lookup(*lookup)
+    day = pd.Timestamp(lookup.date).date()
+    base = (lookup.base or EURO).upper()
+    symbols = lookup.symbols
+    if isinstance(symbols, str):
+        symbols = [symbols]
+    if symbols is not None:
+        symbols = tuple(symbol.upper() for symbol in symbols)
+    return Lookup(day, base, symbols)
+
+
+def _fetch_base(lookup, cross_rates):
+    """
+    Base currency requested from Fixer.io to answer the lookup.
+    """
+    return EURO if cross_rates else lookup.base
+
+
+def _union_symbols(symbol_sets):
+    """
+    Union of symbol sets, None if any set requests all currencies.
+    """
+    union = set()
+    for symbols in symbol_sets:
+        if symbols is None:
+            return None
+        union.update(symbols)
+    return tuple(sorted(union))
+
+
+def _timeseries_windows(dates, max_gap):
+    """
+    Split sorted dates into windows no longer than the timeseries endpoint
+    allows and without gaps longer than max_gap days.
+    """
+    windows = []
+    for day in dates:
+        if (
+            windows
+            and (day - windows[-1][-1]).days <= max_gap
+            and (day - windows[-1][0]).days < MAX_TIMESERIES_DAYS
+        ):
+            windows[-1].append(day)
+        else:
+            windows.append([day])
+    return windows
+
+
+def plan_batch(
+    lookups,
+    cross_rates=True,
+    timeseries=False,
+    max_gap=7,
+    call_costs=None,
+    calendar=None,
+):
+    """
+    Plan the API calls required to answer a list of lookups.
+
+    Lookups are grouped by date and requested base, and each group is
+    answered by one call for the union of its symbols. With a calendar,
+    lookups of days without published rates are answered by the rates of
+    the latest publishing day instead.
+
+    Parameters
+    ----------
+    lookups : list of Lookup or tuples
+        The (date, base, symbols) lookups to answer
+    cross_rates : bool, default True
+        Derive non-EUR bases from EUR rates, as required by the Fixer.io
+        free plan, so that lookups for any base on the same date share
+        a single call.
+    timeseries : bool, default False
+        Use the timeseries endpoint, not available on the free plan, for
+        runs of dates where one call is cheaper than a call per date.
+    max_gap : int, default 7
+        Largest gap, in days, between dates sharing a timeseries call.
+    call_costs : dict, optional
+        Quota cost of one call to the ``historical`` and ``timeseries``
+        endpoints. Defaults to one for both.
+    calendar : PublishingCalendar, optional
+        Calendar of the days on which rates are published, learning from
+        the rates fetched when the plan is executed.
+
+    Returns
+    -------
+    BatchPlan
+    """
+    costs = dict(DEFAULT_CALL_COSTS)
+    if call_costs:
+        costs.update(call_costs)
+    lookups = [_normalize_lookup(lookup) for lookup in lookups]
+    if calendar is None:
+        fetch_dates = [lookup.date for lookup in lookups]
+    else:
+        fetch_dates = [calendar.source_date(lookup.date) for lookup in lookups]
+
+    groups = {}
+    for lookup, fetch_date in zip(lookups, fetch_dates):
+        symbols = lookup.symbols
+        if symbols is not None and cross_rates and lookup.base != EURO:
+            # EUR rates are derived from the base rate
+            symbols = tuple(s for s in symbols if s != EURO) + (lookup.base,)
+        key = (_fetch_base(lookup, cross_rates), fetch_date)
+        groups.setdefault(key, []).append(symbols)
+
+    calls = []
+    for base in sorted({base for base, _ in groups}):
+        dates = sorted(day for group_base, day in groups if group_base == base)
+        if timeseries:
+            windows = _timeseries_windows(dates, max_gap)
+        else:
+            windows = [[day] for day in dates]
+        for window in windows:
+            if (
+                len(window) > 1
+                and len(window) * costs["historical"] > costs["timeseries"]
+            ):
+                symbols = _union_symbols(
+                    symbols for day in window for symbols in groups[(base, day)]
+                )
+                calls.append(
+                    PlannedCall(
+                        "timeseries",
+                        window[0],
+                        window[-1],
+                        base,
+                        symbols,
+                        tuple(window),
+                    )
+                )
+                continue
+            for day in window:
+                symbols = _union_symbols(groups[(base, day)])
+                calls.append(PlannedCall("historical", day, day, base, symbols, (day,)))
+    return BatchPlan(lookups, calls, cross_rates, costs, fetch_dates, calendar)
+
+
+def _run_call(call, api_key, reader_kwargs):
+    """
+    Run one planned call, returning the rates and timestamp, if known,
+    keyed by (base, date).
+    """
+    if call.function == "timeseries":
+        reader_class = FixerTimeseriesReader
+    else:
+        reader_class = FixerForexReader
+    reader = reader_class(
+        base_currency=None if call.base == EURO else call.base,
+        symbols=list(call.symbols) if call.symbols else None,
+        start=call.start,
+        end=call.end,
+        api_key=api_key,
+        raw=True,
+        **reader_kwargs
+    )
+    # Read without closing the shared session, as read() would.
+    result = reader._read_one_data(reader.url, reader.params)
+    if call.function == "historical":
+        result = [result]
+    return {
+        (call.base, record.date): (dict(record), record.timestamp) for record in result
+    }
+
+
+def _observe(calendar, fetched):
+    """
+    Let the calendar learn from the fetched rates, comparing each date
+    with the day before when it was fetched too.
+    """
+    for base, day in sorted(fetched):
+        rates, timestamp = fetched[(base, day)]
+        previous = fetched.get((base, day - timedelta(days=1)))
+        calendar.observe(
+            day, rates, timestamp, previous[0] if previous is not None else None
+        )
+
+
+def _lookup_frame(lookup, rates, cross_rates):
+    """
+    Create the dataframe answering a lookup from the fetched rates.
+    """
+    if cross_rates and lookup.base != EURO:
+        divisor = rates.get(lookup.base)
+        if not divisor:
+            raise RemoteDataError(
+                "No rate for base currency {} on {}".format(lookup.base, lookup.date)
+            )
+        rates = {currency: rate / divisor for currency, rate in rates.items()}
+        rates[EURO] = 1.0 / divisor
+    if lookup.symbols is None:
+        symbols = sorted(rates)
+    else:
+        symbols = sorted(symbol for symbol in set(lookup.symbols) if symbol in rates)
+    df = pd.DataFrame(
+        {"ExRate": [rates[symbol] for symbol in symbols]}, index=symbols, dtype=float
+    )
+    df.insert(0, "Date", pd.Timestamp(lookup.date))
+    return df
+
+
+def execute_plan(
+    plan,
+    api_key=None,
+    max_workers=8,
+    session=None,
+    retry_count=3,
+    pause=0.1,
+    cache=None,
+    cassette=None,
+    transport=None,
+):
+    """
+    Run the calls of a batch plan concurrently and scatter the results
+    back to the lookups.
+
+    Parameters
+    ----------
+    plan : BatchPlan
+        The plan to run
+    api_key : str, optional
+        Fixer.io API key . If not provided, the environment variable
+        FIXERIO_API_KEY is read. The API key is *mandatory*.
+    max_workers : int, default 8
+        Maximum number of concurrent API calls
+    session : Session, default None
+        requests.sessions.Session instance shared by all calls
+    retry_count : int, default 3
+        Number of times to retry each call.
+    pause : float, default 0.1
+        Time, in seconds, of the pause between retries.
+    cache : CacheBackend, optional
+        Cache of API responses
+    cassette : Cassette, optional
+        Cassette recording the responses, or replaying them without
+        using the network.
+    transport : Transport, optional
+        Transport sending the calls instead of the session. An
+        HTTP2Transport multiplexes concurrent calls over a few
+        connections.
+
+    Returns
+    -------
+    list of DataFrame
+        One dataframe per lookup, in the order of ``plan.lookups``.
+        Currencies unknown to Fixer.io are dropped, as for
+        FixerForexReader, so a dataframe may be empty. The
+        "synthesized" entry of the attrs of each dataframe is True when
+        its rates were forward-filled from an earlier publishing day.
+    """
+    if api_key is None:
+        api_key = os.getenv("FIXERIO_API_KEY")
+    own_session = session is None
+    session = _init_session(session)
+    reader_kwargs = dict(
+        session=session,
+        retry_count=retry_count,
+        pause=pause,
+        cache=cache,
+        cassette=cassette,
+        transport=transport,
+    )
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                lambda call: _run_call(call, api_key, reader_kwargs),
+                plan.calls,
+            )
+            fetched = {}
+            for result in results:
+                fetched.update(result)
+    finally:
+        if own_session:
+            session.close()
+    if plan.calendar is not None:
+        _observe(plan.calendar, fetched)
+
+    frames = []
+    for lookup, fetch_date in zip(plan.lookups, plan.fetch_dates):
+        key = (_fetch_base(lookup, plan.cross_rates), fetch_date)
+        rates = fetched[key][0] if key in fetched else {}
+        df = _lookup_frame(lookup, rates, plan.cross_rates)
+        df.attrs["synthesized"] = fetch_date != lookup.date
+        frames.append(df)
+    return frames
+
+
+def read_batch(
+    lookups,
+    api_key=None,
+    cross_rates=True,
+    timeseries=False,
+    max_gap=7,
+    call_costs=None,
+    max_workers=8,
+    session=None,
+    retry_count=3,
+    pause=0.1,
+    cache=None,
+    cassette=None,
+    transport=None,
+    calendar=None,
+    dry_run=False,
+):
+    """
+    Answer many (date, base, symbols) lookups with a minimal set of
+    concurrent API calls.
+
+    Parameters
+    ----------
+    lookups : list of Lookup or tuples
+        The (date, base, symbols) lookups to answer
+    api_key : str, optional
+        Fixer.io API key . If not provided, the environment variable
+        FIXERIO_API_KEY is read. The API key is *mandatory*.
+    cross_rates, timeseries, max_gap, call_costs, calendar
+        Planning options, see plan_batch.
+    max_workers, session, retry_count, pause, cache, cassette, transport
+        Execution options, see execute_plan.
+    dry_run : bool, default False
+        Return the BatchPlan, with its call count and estimated cost,
+        without calling the API.
+
+    Returns
+    -------
+    list of DataFrame, or BatchPlan if dry_run is True
+    """
+    plan = plan_batch(
+        lookups,
+        cross_rates=cross_rates,
+        timeseries=timeseries,
+        max_gap=max_gap,
+        call_costs=call_costs,
+        calendar=calendar,
+    )
+    if dry_run:
+        return plan
+    return execute_plan(
+        plan,
+        api_key=api_key,
+        max_workers=max_workers,
+        session=session,
+        retry_count=retry_count,
+        pause=pause,
+        cache=cache,
+        cassette=cassette,
+        transport=transport,
+    )
@@ -0,0 +1,351 @@
+"""
+Cache backends shared by Fixer readers.
+
+Responses are cached in a compact binary encoding, see dumps and loads,
+so the same bytes can be shared by every backend.
+"""
+import hashlib
+import os
+import socket
+import struct
+import threading
+import time
+from datetime import date, datetime, timedelta
+from urllib.parse import urlencode
+
+_EPOCH = date(1970, 1, 1)
+
+# version, historical flag, timestamp, days since epoch, base, currency count
+_HEADER = struct.Struct("<BBqi3sH")
+_VERSION = 1
+_NO_DATE = -(2**31)
+
+
+def dumps(out):
+    """
+    Encode a Fixer.io rates response as bytes.
+
+    Parameters
+    ----------
+    out : dict
+        Successful response of the latest or historical endpoint
+
+    Returns
+    -------
+    bytes
+    """
+    rates = out["rates"]
+    currencies = sorted(rates)
+    day = out.get("date")
+    days = (
+        (datetime.strptime(day, "%Y-%m-%d").date() - _EPOCH).days if day else _NO_DATE
+    )
+    return b"".join(
+        [
+            _HEADER.pack(
+                _VERSION,
+                bool(out.get("historical")),
+                out.get("timestamp") or 0,
+                days,
+                out.get("base", "EUR").encode("ascii"),
+                len(currencies),
+            ),
+            "".join(currencies).encode("ascii"),
+            struct.pack(
+                "<{}d".format(len(currencies)), *(rates[c] for c in currencies)
+            ),
+        ]
+    )
+
+
+def loads(data):
+    """
+    Decode a Fixer.io rates response encoded by dumps.
+
+    Returns
+    -------
+    dict
+
+    Raises
+    ------
+    ValueError
+        If data is not a response encoded by dumps, e.g. truncated
+    """
+    try:
+        version, historical, timestamp, days, base, count = _HEADER.unpack_from(data)
+    except struct.error as exc:
+        raise ValueError("Invalid cache encoding: {}".format(exc))
+    if version != _VERSION:
+        raise ValueError("Unsupported cache encoding version {}".format(version))
+    offset = _HEADER.size
+    if len(data) != offset + 11 * count:
+        raise ValueError(
+            "Invalid cache encoding of {} bytes for {} currencies".format(
+                len(data), count
+            )
+        )
+    codes = data[offset : offset + 3 * count].decode("ascii")
+    values = struct.unpack_from("<{}d".format(count), data, offset + 3 * count)
+    out = {
+        "success": True,
+        "timestamp": timestamp,
+        "base": base.decode("ascii"),
+        "rates": {codes[3 * i : 3 * i + 3]: values[i] for i in range(count)},
+    }
+    if historical:
+        out["historical"] = True
+    if days != _NO_DATE:
+        out["date"] = (_EPOCH + timedelta(days=days)).isoformat()
+    return out
+
+
+def decode_cached(data):
+    """
+    Response encoded in the cached value data, None if missing or if it
+    cannot be decoded, e.g. truncated or written by another program, so
+    that a bad value shared by many readers only costs an API call.
+    """
+    if data is None:
+        return None
+    try:
+        return loads(data)
+    except ValueError:
+        return None
+
+
+def load_cached(cache, key, timeout=None):
+    """
+    Cached response of key, None if missing or if the cached value cannot
+    be decoded.
+    """
+    return decode_cached(cache.get(key, timeout))
+
+
+def is_cacheable(out):
+    """True if the response can be encoded by dumps"""
+    rates = out.get("rates")
+    return (
+        bool(out.get("success"))
+        and isinstance(rates, dict)
+        and all(len(c) == 3 and isinstance(r, (int, float)) for c, r in rates.items())
+    )
+
+
+def cache_key(url, params):
+    """Cache key of a request, independent of the API key"""
+    params = sorted((k, v) for k, v in (params or {}).items() if k != "access_key")
+    return url + "?" + urlencode(params)
+
+
+def response_ttl(out, cache_ttl):
+    """
+    Time to cache a response. Rates of past days never change and are
+    cached without expiry, those of the current UTC day for cache_ttl.
+    """
+    if out.get("date", "") >= datetime.utcnow().strftime("%Y-%m-%d"):
+        return cache_ttl
+    return None
+
+
+def _hashed(key):
+    """Fixed length key safe to use as a file name or memcached key"""
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+class CacheBackend(object):
+    """
+    Interface of the cache backends used by Fixer readers.
+
+    Keys are strings and values are bytes. A ttl of None means the value
+    never expires. A timeout, in seconds, bounds the wait of backends over
+    the network, which treat a timeout of 0 as a miss without any I/O.
+    """
+
+    def get(self, key, timeout=None):
+        """Cached value of key, None if missing or expired"""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None, timeout=None):
+        """Cache value for ttl seconds"""
+        raise NotImplementedError
+
+    def get_many(self, keys, timeout=None):
+        """
+        Cached values of several keys.
+
+        Returns
+        -------
+        dict
+            Value of each key found in the cache
+        """
+        values = {}
+        for key in keys:
+            value = self.get(key, timeout)
+            if value is not None:
+                values[key] = value
+        return values
+
+
+class MemoryCache(CacheBackend):
+    """
+    Thread-safe in-process cache.
+    """
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, timeout=None):
+        with self._lock:
+            expires, value = self._values.get(key, (None, None))
+            if expires is not None and expires <= time.time():
+                del self._values[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl=None, timeout=None):
+        expires = None if ttl is None else time.time() + ttl
+        with self._lock:
+            self._values[key] = (expires, value)
+
+
+class FileCache(CacheBackend):
+    """
+    Cache storing one file per key in a directory, which may be shared
+    by several processes or nodes.
+
+    Parameters
+    ----------
+    directory : str
+        Cache directory, created if it does not exist.
+    """
+
+    _expires = struct.Struct("<d")
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, _hashed(key))
+
+    def get(self, key, timeout=None):
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < self._expires.size:
+            return None
+        (expires,) = self._expires.unpack_from(data)
+        if expires and expires <= time.time():
+            return None
+        return data[self._expires.size :]
+
+    def set(self, key, value, ttl=None, timeout=None):
+        path = self._path(key)
+        tmp_path = "{}.{}.{}".format(path, os.getpid(), threading.get_ident())
+        with open(tmp_path, "wb") as f:
+            f.write(self._expires.pack(0 if ttl is None else time.time() + ttl))
+            f.write(value)
+        os.replace(tmp_path, path)
+
+
+class MemcachedCache(CacheBackend):
+    """
+    Cache on a network key-value server speaking the memcached text
+    protocol, shared by every node of a deployment.
+
+    Network errors are treated as cache misses, so an unavailable server
+    only costs API calls.
+
+    Parameters
+    ----------
+    host : str, default "localhost"
+    port : int, default 11211
+    timeout : float, default 1.0
+        Socket timeout, in seconds, cut to the timeout of a call if
+        smaller
+    """
+
+    # memcached reads expiry times above 30 days as UNIX timestamps
+    _MAX_RELATIVE_TTL = 60 * 60 * 24 * 30
+
+    def __init__(self, host="localhost", port=11211, timeout=1.0):
+        self.address = (host, port)
+        self.timeout = timeout
+        self._sock = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def close(self):
+        """Close the connection to the server"""
+        with self._lock:
+            self._disconnect()
+
+    def _disconnect(self):
+        if self._sock is not None:
+            self._file.close()
+            self._sock.close()
+        self._sock = self._file = None
+
+    def _timeout(self, timeout):
+        """Smaller of timeout and the socket timeout, None meaning no limit"""
+        if timeout is None:
+            return self.timeout
+        if self.timeout is None:
+            return timeout
+        return min(timeout, self.timeout)
+
+    def _connect(self, timeout):
+        if self._sock is None:
+            self._sock = socket.create_connection(self.address, timeout)
+            self._file = self._sock.makefile("rb")
+        else:
+            self._sock.settimeout(timeout)
+
+    def get(self, key, timeout=None):
+        return self.get_many([key], timeout).get(key)
+
+    def get_many(self, keys, timeout=None):
+        keys = list(keys)
+        timeout = self._timeout(timeout)
+        if not keys or (timeout is not None and timeout <= 0):
+            return {}
+        hashed = {_hashed(key): key for key in keys}
+        values = {}
+        with self._lock:
+            try:
+                self._connect(timeout)
+                self._sock.sendall(
+                    "get {}\r\n".format(" ".join(hashed)).encode("ascii")
+                )
+                while True:
+                    line = self._file.readline()
+                    if line == b"END\r\n":
+                        break
+                    if not line.startswith(b"VALUE "):
+                        raise OSError("Unexpected memcached reply {!r}".format(line))
+                    _, name, _, size = line.split()
+                    data = self._file.read(int(size) + 2)[:-2]
+                    values[hashed[name.decode("ascii")]] = data
+            except OSError:
+                self._disconnect()
+                return {}
+        return values
+
+    def set(self, key, value, ttl=None, timeout=None):
+        timeout = self._timeout(timeout)
+        if timeout is not None and timeout <= 0:
+            return
+        exptime = 0 if ttl is None else max(int(ttl), 1)
+        if exptime > self._MAX_RELATIVE_TTL:
+            exptime = int(time.time()) + exptime
+        command = "set {} 0 {} {}\r\n".format(_hashed(key), exptime, len(value))
+        with self._lock:
+            try:
+                self._connect(timeout)
+                self._sock.sendall(command.encode("ascii") + value + b"\r\n")
+                self._file.readline()
+            except OSError:
+                self._disconnect()
@@ -0,0 +1,174 @@
+"""
+Record and replay of Fixer.io responses for deterministic offline runs.
+
+A cassette file holds the zlib compressed body of each recorded response
+followed by a compressed index of their offsets, so opening a cassette
+only reads the index and bodies are read when replayed.
+"""
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+
+from pandas_datareader._utils import RemoteDataError
+
+from .cache import cache_key
+
+_MAGIC = b"FXCS\x01"
+_FOOTER = struct.Struct("<Q")
+
+
+class RecordedResponse(object):
+    """
+    Replayed response, providing the parts of requests.Response used
+    by the readers.
+    """
+
+    encoding = "utf-8"
+
+    def __init__(self, url, status_code, content):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding)
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class Cassette(object):
+    """
+    File of recorded responses, keyed by URL and parameters without the
+    API key.
+
+    Parameters
+    ----------
+    path : str
+        Path of the cassette file
+    mode : {"replay", "record"}, default "replay"
+        In replay mode responses are served from the cassette and the
+        network is never used. In record mode every request is sent and
+        its response added to the cassette, which is written by save or
+        close.
+    latency : float, default 0
+        Time, in seconds, to wait before serving each replayed response.
+    """
+
+    def __init__(self, path, mode="replay", latency=0.0):
+        if mode not in ("replay", "record"):
+            raise ValueError("mode must be replay or record")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self._index = {}
+        self._recorded = {}
+        self._file = None
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self._file = open(path, "rb")
+            self._index = self._read_index()
+        elif mode == "replay":
+            raise FileNotFoundError(path)
+
+    def _read_index(self):
+        self._file.seek(0)
+        if self._file.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError("{} is not a cassette file".format(self.path))
+        self._file.seek(-_FOOTER.size, os.SEEK_END)
+        index_end = self._file.tell()
+        (index_offset,) = _FOOTER.unpack(self._file.read(_FOOTER.size))
+        self._file.seek(index_offset)
+        data = self._file.read(index_end - index_offset)
+        return json.loads(zlib.decompress(data))
+
+    def __len__(self):
+        return len(set(self._index) | set(self._recorded))
+
+    def __contains__(self, key):
+        return key in self._recorded or key in self._index
+
+    def _body(self, key):
+        """Compressed body and status code of a recorded response"""
+        with self._lock:
+            if key in self._recorded:
+                return self._recorded[key]
+            offset, length, status_code = self._index[key]
+            self._file.seek(offset)
+            return self._file.read(length), status_code
+
+    def get_response(self, url, params, fetch):
+        """
+        Replay the response of a request, or record it in record mode.
+
+        Parameters
+        ----------
+        url : str
+            target URL
+        params : dict or None
+            parameters passed to the URL
+        fetch : callable
+            Called without arguments to send the request when recording
+
+        Returns
+        -------
+        response
+        """
+        key = cache_key(url, params)
+        if self.mode == "record":
+            response = fetch()
+            body = zlib.compress(response.content)
+            with self._lock:
+                self._recorded[key] = (body, response.status_code)
+            return response
+        if key not in self:
+            raise RemoteDataError("No recorded response for {}".format(key))
+        body, status_code = self._body(key)
+        if self.latency:
+            time.sleep(self.latency)
+        return RecordedResponse(url, status_code, zlib.decompress(body))
+
+    def save(self):
+        """Write the cassette file, including the responses recorded"""
+        with self._lock:
+            keys = sorted(set(self._index) | set(self._recorded))
+            tmp_path = self.path + ".tmp"
+            index = {}
+            with open(tmp_path, "wb") as f:
+                f.write(_MAGIC)
+                for key in keys:
+                    if key in self._recorded:
+                        body, status_code = self._recorded[key]
+                    else:
+                        offset, length, status_code = self._index[key]
+                        self._file.seek(offset)
+                        body = self._file.read(length)
+                    index[key] = (f.tell(), len(body), status_code)
+                    f.write(body)
+                index_offset = f.tell()
+                f.write(zlib.compress(json.dumps(index).encode("utf-8")))
+                f.write(_FOOTER.pack(index_offset))
+            if self._file is not None:
+                self._file.close()
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, "rb")
+            self._index = index
+            self._recorded = {}
+
+    def close(self):
+        """Save recorded responses and close the cassette file"""
+        if self._recorded:
+            self.save()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
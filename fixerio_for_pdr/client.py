@@ -0,0 +1,299 @@
+"""
+Long-lived, thread-safe Fixer.io client.
+"""
+import os
+import threading
+import time
+from datetime import date, datetime
+
+import pandas as pd
+import requests
+from pandas_datareader._utils import RemoteDataError
+
+from . import FIXERIO_BASE_URL
+from .cache import cache_key, dumps, is_cacheable, response_ttl
+from .deadline import (
+    Deadline,
+    DeadlineExceeded,
+    get_with_retries,
+    read_cached,
+    stale_keys,
+)
+from .forex import _rates_frame, _timeseries_frame
+from .record import RateRecord
+
+
+class RateLimiter(object):
+    """
+    Thread-safe limiter spacing calls evenly at a maximum rate.
+
+    Parameters
+    ----------
+    calls_per_second : float
+        Maximum rate of calls
+    """
+
+    def __init__(self, calls_per_second):
+        self.interval = 1.0 / calls_per_second
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Wait until a call is allowed"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _format_date(value):
+    """ISO format date string of a date like value, UTC today if None"""
+    if value is None:
+        value = datetime.utcnow().date()
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d")
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+class FixerClient(object):
+    """
+    Fixer.io client safe to share between threads and reuse for many
+    requests.
+
+    Unlike the readers, which hold the date and symbols of a single
+    request, the client holds only the API key, the pooled session, the
+    cache and the rate limiter; the date and symbols are arguments of
+    each read method.
+
+    Parameters
+    ----------
+    api_key : str, optional
+        Fixer.io API key . If not provided, the environment variable
+        FIXERIO_API_KEY is read. The API key is *mandatory*.
+    session : Session, default None
+        requests.sessions.Session instance to be used. A session pooling
+        pool_size connections is created if not provided.
+    cache : CacheBackend, optional
+        Cache of API responses, shared with readers using the same backend.
+    cache_ttl : float, default 3600
+        Time, in seconds, to cache the rates of the current UTC day.
+    limiter : RateLimiter, optional
+        Limiter of the rate of API calls
+    retry_count : int, default 3
+        Number of times to retry a query request.
+    pause : float, default 0.1
+        Time, in seconds, of the pause between retries.
+    timeout : float, default 30
+        Time, in seconds, to wait for a response.
+    pool_size : int, default 10
+        Number of pooled connections of the created session.
+    cassette : Cassette, optional
+        Cassette recording the responses, or replaying them without
+        using the network.
+    deadline : float, optional
+        Time, in seconds, allowed for each read including its retries and
+        parsing. When get_rates exceeds it the freshest cached rates of
+        the stale_days previous days are returned, flagged as stale as by
+        FixerForexReader, or DeadlineExceeded is raised.
+    stale_days : int, default 7
+        Number of previous days searched in the cache when the deadline
+        is exceeded.
+    transport : Transport, optional
+        Transport sending the requests instead of the session, e.g. an
+        HTTP2Transport. It is not closed by close.
+    """
+
+    def __init__(
+        self,
+        api_key=None,
+        session=None,
+        cache=None,
+        cache_ttl=3600,
+        limiter=None,
+        retry_count=3,
+        pause=0.1,
+        timeout=30,
+        pool_size=10,
+        cassette=None,
+        deadline=None,
+        stale_days=7,
+        transport=None,
+    ):
+        if api_key is None:
+            api_key = os.getenv("FIXERIO_API_KEY")
+        if not api_key or not isinstance(api_key, str):
+            raise ValueError(
+                """The Fixer.io API key must be provided
+                either as the api_key variable or as the
+                environment varible FIXERIO_API_KEY"""
+            )
+        self.api_key = api_key
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1, pool_maxsize=pool_size
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.limiter = limiter
+        self.retry_count = retry_count
+        self.pause = pause
+        self.timeout = timeout
+        self.cassette = cassette
+        self.deadline = deadline
+        self.stale_days = stale_days
+        self.transport = transport
+
+    def close(self):
+        """Close network session"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _params(self, base, symbols):
+        params = {"access_key": self.api_key}
+        if base:
+            params["base"] = base
+        if symbols:
+            if isinstance(symbols, str):
+                symbols = [symbols]
+            params["symbols"] = ",".join(symbols)
+        return params
+
+    def _deadline(self):
+        """Deadline of a read starting now, None if not bounded"""
+        if self.deadline is None:
+            return None
+        return Deadline(self.deadline)
+
+    def _get_response(self, url, params, deadline=None):
+        """
+        Send the request, or replay it from the cassette.
+        """
+        if self.cassette is None:
+            return self._send(url, params, deadline)
+        return self.cassette.get_response(
+            url, params, lambda: self._send(url, params, deadline)
+        )
+
+    def _get(self, url, params, timeout):
+        if self.limiter is not None:
+            self.limiter.acquire()
+        http = self.session if self.transport is None else self.transport
+        return http.get(url, params=params, timeout=timeout)
+
+    def _send(self, url, params, deadline=None):
+        """
+        Send the request, retrying as the readers do.
+        """
+        return get_with_retries(
+            lambda timeout: self._get(url, params, timeout),
+            url,
+            self.timeout,
+            self.retry_count,
+            self.pause,
+            deadline,
+        )
+
+    def _read_cached(self, url, params, day, deadline=None):
+        """
+        Return the cached rates response, None if not cached, and, with a
+        deadline, the date and freshest cached response of the stale_days
+        before day, looked up together.
+        """
+        if self.cache is None:
+            return None, (None, None)
+        stale = () if deadline is None else stale_keys(params, day, self.stale_days)
+        return read_cached(self.cache, cache_key(url, params), deadline, stale)
+
+    def _read(self, url, params, deadline=None):
+        """
+        Return the rates response of the API, cached if possible.
+        """
+        out = self._get_response(url, params, deadline).json()
+        if "rates" not in out:
+            raise RemoteDataError()
+        if self.cache is not None and is_cacheable(out):
+            self.cache.set(
+                cache_key(url, params),
+                dumps(out),
+                response_ttl(out, self.cache_ttl),
+                None if deadline is None else deadline.remaining(),
+            )
+        if deadline is not None:
+            deadline.check(url)
+        return out
+
+    def get_rates(self, date=None, symbols=None, base=None, raw=False):
+        """
+        Return DataFrame of the rates of one date, as FixerForexReader,
+        or a RateRecord when raw.
+
+        Parameters
+        ----------
+        date : string, date, datetime, Timestamp, optional
+            UTC date of the rates, UTC today if not provided
+        symbols : str, array-like object, optional
+            A single currency code or list of the currency codes.
+        base : str, optional
+            The base currency code
+        raw : bool, default False
+            Return a RateRecord instead of a DataFrame
+        """
+        day = _format_date(date)
+        url = FIXERIO_BASE_URL + day
+        params = self._params(base, symbols)
+        deadline = self._deadline()
+        out, (stale_day, stale_out) = self._read_cached(url, params, day, deadline)
+        stale = False
+        if out is None:
+            try:
+                out = self._read(url, params, deadline)
+            except DeadlineExceeded:
+                if stale_out is None:
+                    raise
+                day, out = stale_day.strftime("%Y-%m-%d"), stale_out
+                stale = True
+        if raw:
+            return RateRecord.from_response(
+                out, datetime.strptime(day, "%Y-%m-%d").date(), stale
+            )
+        df = _rates_frame(out["rates"], pd.Timestamp(day))
+        if stale:
+            df.attrs["stale"] = True
+        return df
+
+    def get_timeseries(self, start, end, symbols=None, base=None):
+        """
+        Return DataFrame of the daily rates between two dates, as
+        FixerTimeseriesReader.
+
+        Parameters
+        ----------
+        start, end : string, date, datetime, Timestamp
+            First and last UTC dates, at most 365 days apart
+        symbols : str, array-like object, optional
+            A single currency code or list of the currency codes.
+        base : str, optional
+            The base currency code
+        """
+        params = self._params(base, symbols)
+        params["start_date"] = _format_date(start)
+        params["end_date"] = _format_date(end)
+        out = self._get_response(
+            FIXERIO_BASE_URL + "timeseries", params, self._deadline()
+        ).json()
+        try:
+            rates = out["rates"]
+        except KeyError:
+            raise RemoteDataError()
+        return _timeseries_frame(rates)
@@ -0,0 +1,179 @@
+"""
+Time budgets bounding a rate lookup from the first request to the parsed
+result.
+"""
+import time
+from datetime import timedelta
+
+import pandas as pd
+import requests
+from pandas_datareader._utils import RemoteDataError
+
+from . import FIXERIO_BASE_URL
+from .cache import cache_key, decode_cached
+
+
+class DeadlineExceeded(RemoteDataError):
+    """
+    Raised when a rate lookup runs out of its time budget and no cached
+    rates can be returned instead.
+    """
+
+
+class Deadline(object):
+    """
+    Time budget of one lookup, shared by its connections, retries and
+    parsing.
+
+    Parameters
+    ----------
+    seconds : float
+        Budget, in seconds, starting now
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+
+    def remaining(self):
+        """Time, in seconds, left in the budget"""
+        return max(0.0, self.expires - time.monotonic())
+
+    def _exceeded(self, url):
+        return DeadlineExceeded(
+            "Deadline of {}s exceeded reading URL: {}".format(self.seconds, url)
+        )
+
+    def check(self, url):
+        """Raise DeadlineExceeded if the budget is spent"""
+        if self.remaining() <= 0:
+            raise self._exceeded(url)
+
+    def timeout(self, timeout, url):
+        """
+        Timeout of the next request, the smaller of timeout and the time
+        left in the budget.
+        """
+        left = self.remaining()
+        if left <= 0:
+            raise self._exceeded(url)
+        if timeout is None:
+            return left
+        return min(timeout, left)
+
+    def sleep(self, seconds, url):
+        """Pause between retries, without sleeping past the deadline"""
+        time.sleep(min(seconds, self.remaining()))
+        self.check(url)
+
+
+def get_with_retries(get, url, timeout, retry_count, pause, deadline=None):
+    """
+    Send a request, retrying as the readers do until it succeeds, the
+    retries are used up or the deadline, if any, is exceeded.
+
+    With a deadline the timeout of each attempt is cut to the time left,
+    so a connect or a read never waits past the deadline.
+
+    Parameters
+    ----------
+    get : callable
+        Called with the timeout of the attempt to send the request
+    url : str
+        target URL
+    timeout : float or None
+        Timeout of a single attempt
+    retry_count : int
+        Number of times to retry the request.
+    pause : float
+        Time, in seconds, of the pause between retries.
+    deadline : Deadline, optional
+        Time budget of the lookup
+
+    Returns
+    -------
+    response
+    """
+    last_exception = None
+    for _ in range(retry_count + 1):
+        try:
+            if deadline is None:
+                response = get(timeout)
+            else:
+                response = get(deadline.timeout(timeout, url))
+        except requests.exceptions.RequestException as exc:
+            if deadline is not None:
+                deadline.check(url)
+            last_exception = exc
+        else:
+            if response.status_code == requests.codes.ok:
+                return response
+        if deadline is None:
+            time.sleep(pause)
+        else:
+            deadline.sleep(pause, url)
+    msg = "Unable to read URL: {}".format(url)
+    if last_exception is not None:
+        msg += "\nException:\n{}".format(last_exception)
+    raise RemoteDataError(msg)
+
+
+def stale_keys(params, day, days):
+    """
+    Cache keys of the requests of the days before day.
+
+    Parameters
+    ----------
+    params : dict
+        Parameters of the request of day
+    day : string, date, datetime, Timestamp
+        Date of the request
+    days : int
+        Number of previous days to look back
+
+    Returns
+    -------
+    list of (Timestamp, str)
+        Date and cache key of each previous day, freshest first
+    """
+    day = pd.Timestamp(day).normalize()
+    dates = [day - timedelta(days=n) for n in range(1, days + 1)]
+    return [
+        (d, cache_key(FIXERIO_BASE_URL + d.strftime("%Y-%m-%d"), params)) for d in dates
+    ]
+
+
+def read_cached(cache, key, deadline=None, stale=()):
+    """
+    Cached response of key and freshest cached response of the stale
+    days, in a single cache lookup bounded by the deadline.
+
+    The stale rates are looked up before any request is sent, so they can
+    be returned once the deadline is exceeded without another lookup.
+
+    Parameters
+    ----------
+    cache : CacheBackend
+        Cache of API responses
+    key : str
+        Cache key of the request
+    deadline : Deadline, optional
+        Time budget of the lookup
+    stale : list of (Timestamp, str)
+        Date and cache key of the previous days, freshest first, as
+        returned by stale_keys
+
+    Returns
+    -------
+    (dict, (Timestamp, dict))
+        Cached response, None if not cached, and date and freshest cached
+        response of the stale days, (None, None) if none is cached
+    """
+    timeout = None if deadline is None else deadline.remaining()
+    cached = cache.get_many([key] + [k for _, k in stale], timeout)
+    out = decode_cached(cached.get(key))
+    for day, stale_key in stale:
+        stale_out = decode_cached(cached.get(stale_key))
+        if stale_out is not None:
+            return out, (day, stale_out)
+    return out, (None, None)
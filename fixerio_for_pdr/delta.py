@@ -0,0 +1,272 @@
+"""
+Delta-compressed storage of daily rate history.
+
+Each day is encoded as the currencies whose rate changed since the
+previous day. Consecutive identical days collapse into a single record
+with a run length, and every keyframe_interval-th record is a keyframe
+holding every rate, so decoding a range only replays the records since
+the nearest keyframe. Encoding and decoding are vectorized with numpy.
+"""
+import numpy as np
+import pandas as pd
+
+_VERSION = 1
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+
+def _changed(values, previous):
+    """Mask of the rates differing from the previous row, NaN equal to NaN"""
+    same = (values == previous) | (np.isnan(values) & np.isnan(previous))
+    return ~same
+
+
+class DeltaHistory(object):
+    """
+    Daily rates of one base, indexed by date with a column per currency,
+    stored as keyframes, deltas and runs of identical days.
+
+    Create with from_frame or load, and read with to_frame.
+
+    Parameters
+    ----------
+    currencies : ndarray
+        Currency codes, the columns of the history
+    dates : ndarray
+        Days since the UNIX epoch of each stored date, increasing
+    record_start : ndarray
+        Index in dates of the first day of each record
+    keyframe : ndarray
+        True for the records holding every rate
+    offsets : ndarray
+        Start of the entries of each record, followed by the entry count
+    columns : ndarray
+        Currency index of each entry
+    values : ndarray
+        Rate of each entry
+    keyframe_interval : int
+        Number of records between keyframes
+    """
+
+    def __init__(
+        self,
+        currencies,
+        dates,
+        record_start,
+        keyframe,
+        offsets,
+        columns,
+        values,
+        keyframe_interval,
+    ):
+        self.currencies = currencies
+        self.dates = dates
+        self.record_start = record_start
+        self.keyframe = keyframe
+        self.offsets = offsets
+        self.columns = columns
+        self.values = values
+        self.keyframe_interval = keyframe_interval
+
+    @classmethod
+    def from_frame(cls, df, keyframe_interval=32):
+        """
+        Encode a dataframe of rates indexed by date with a column per
+        currency, such as returned by RateStore.read.
+
+        Parameters
+        ----------
+        df : DataFrame
+            The rates, with unique dates
+        keyframe_interval : int, default 32
+            Number of records between keyframes. Smaller intervals
+            make random access faster and the encoding larger.
+
+        Returns
+        -------
+        DeltaHistory
+        """
+        history = cls(
+            np.array(sorted(df.columns), dtype="U3"),
+            np.empty(0, dtype=np.int32),
+            np.empty(0, dtype=np.int32),
+            np.empty(0, dtype=bool),
+            np.zeros(1, dtype=np.int64),
+            np.empty(0, dtype=np.int16),
+            np.empty(0, dtype=np.float64),
+            keyframe_interval,
+        )
+        history.append(df)
+        return history
+
+    def _dates_of(self, index):
+        days = pd.DatetimeIndex(index).values.astype("datetime64[D]")
+        return (days - _EPOCH).astype(np.int32)
+
+    def append(self, df):
+        """
+        Append the rates of dates later than the last stored date.
+
+        Currencies not in the history are ignored and currencies missing
+        from df are stored as NaN.
+        """
+        df = df.sort_index()
+        dates = self._dates_of(df.index)
+        if len(dates) == 0:
+            return
+        if np.any(np.diff(dates) <= 0) or (
+            len(self.dates) and dates[0] <= self.dates[-1]
+        ):
+            raise ValueError("Appended dates must be unique and after the last date")
+        values = df.reindex(columns=self.currencies).to_numpy(dtype=np.float64)
+
+        if len(self.dates):
+            previous = self._decode(len(self.dates) - 1, len(self.dates) - 1)[-1]
+            changed = _changed(values, np.vstack([previous, values[:-1]]))
+        else:
+            changed = _changed(values, np.vstack([values[:1], values[:-1]]))
+            # The first day always starts a record
+            changed[0] = True
+        # Days identical to the previous day extend its record's run
+        new_record = changed.any(axis=1)
+        rows = np.flatnonzero(new_record)
+        ordinal = len(self.record_start) + np.arange(len(rows))
+        keyframe = ordinal % self.keyframe_interval == 0
+        changed[rows[keyframe]] = True
+
+        entry_rows, entry_columns = np.nonzero(changed[rows])
+        counts = np.bincount(entry_rows, minlength=len(rows))
+        self.record_start = np.concatenate(
+            [self.record_start, (rows + len(self.dates)).astype(np.int32)]
+        )
+        self.keyframe = np.concatenate([self.keyframe, keyframe])
+        self.offsets = np.concatenate(
+            [self.offsets, self.offsets[-1] + np.cumsum(counts)]
+        )
+        self.columns = np.concatenate([self.columns, entry_columns.astype(np.int16)])
+        self.values = np.concatenate(
+            [self.values, values[rows[entry_rows], entry_columns]]
+        )
+        self.dates = np.concatenate([self.dates, dates])
+
+    def _decode(self, first, last):
+        """
+        Decode the rates of the days with index first to last inclusive.
+
+        Returns
+        -------
+        ndarray
+            Rates of each day, with a column per currency
+        """
+        first_record = np.searchsorted(self.record_start, first, "right") - 1
+        last_record = np.searchsorted(self.record_start, last, "right") - 1
+        keyframes = np.flatnonzero(self.keyframe[: first_record + 1])
+        start_record = keyframes[-1]
+
+        n_records = last_record - start_record + 1
+        lo, hi = self.offsets[start_record], self.offsets[last_record + 1]
+        counts = np.diff(self.offsets[start_record : last_record + 2])
+        entry_rows = np.repeat(np.arange(n_records), counts)
+        entry_columns = self.columns[lo:hi]
+
+        n_columns = len(self.currencies)
+        state = np.full((n_records, n_columns), np.nan)
+        state[entry_rows, entry_columns] = self.values[lo:hi]
+        # Forward fill each currency from the record that last set it
+        source = np.zeros((n_records, n_columns), dtype=np.int64)
+        source[entry_rows, entry_columns] = entry_rows
+        np.maximum.accumulate(source, axis=0, out=source)
+        state = state[source, np.arange(n_columns)]
+
+        day_records = (
+            np.searchsorted(self.record_start, np.arange(first, last + 1), "right")
+            - 1
+            - start_record
+        )
+        return state[day_records]
+
+    def to_frame(self, start=None, end=None, symbols=None):
+        """
+        Decode the rates between start and end inclusive.
+
+        Parameters
+        ----------
+        start, end : string, date, datetime, Timestamp, optional
+            First and last dates, the whole history if not provided
+        symbols : str, array-like object, optional
+            Currency codes, all stored currencies if not provided
+
+        Returns
+        -------
+        DataFrame
+            Rates indexed by date with a column per currency.
+        """
+        first = 0
+        last = len(self.dates) - 1
+        if start is not None:
+            first = np.searchsorted(self.dates, self._dates_of([start])[0], "left")
+        if end is not None:
+            last = np.searchsorted(self.dates, self._dates_of([end])[0], "right") - 1
+        if last < first:
+            rates = np.empty((0, len(self.currencies)))
+        else:
+            rates = self._decode(first, last)
+        index = pd.DatetimeIndex(
+            (self.dates[first : last + 1] + _EPOCH).astype("datetime64[ns]"),
+            name="Date",
+        )
+        df = pd.DataFrame(rates, index=index, columns=list(self.currencies))
+        if symbols is not None:
+            if isinstance(symbols, str):
+                symbols = [symbols]
+            df = df[list(symbols)]
+        return df
+
+    @property
+    def nbytes(self):
+        """Size of the encoded history, in bytes"""
+        return sum(
+            array.nbytes
+            for array in (
+                self.currencies,
+                self.dates,
+                self.record_start,
+                self.keyframe,
+                self.offsets,
+                self.columns,
+                self.values,
+            )
+        )
+
+    def save(self, path):
+        """Save the encoded history to a numpy .npz file"""
+        np.savez(
+            path,
+            version=np.array(_VERSION),
+            keyframe_interval=np.array(self.keyframe_interval),
+            currencies=self.currencies,
+            dates=self.dates,
+            record_start=self.record_start,
+            keyframe=self.keyframe,
+            offsets=self.offsets,
+            columns=self.columns,
+            values=self.values,
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Load an encoded history saved by save"""
+        with np.load(path) as data:
+            if int(data["version"]) != _VERSION:
+                raise ValueError(
+                    "Unsupported history version {}".format(int(data["version"]))
+                )
+            return cls(
+                data["currencies"],
+                data["dates"],
+                data["record_start"],
+                data["keyframe"],
+                data["offsets"],
+                data["columns"],
+                data["values"],
+                int(data["keyframe_interval"]),
+            )
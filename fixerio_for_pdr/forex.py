@@ -1,6 +1,36 @@
 import pandas as pd
 from pandas_datareader._utils import RemoteDataError
 from . import Fixer, FIXERIO_BASE_URL
+from .deadline import stale_keys
+from .record import RateRecord
+
+
+def _rates_frame(rates, date):
+    """
+    Create dataframe, indexed by currency, from the rates of one date.
+    """
+    df = pd.DataFrame.from_dict(rates, orient="index", columns=['ExRate'])
+    df.insert(0, "Date", date)
+    df.sort_index(ascending=True, inplace=True)
+    return df
+
+
+def _timeseries_frame(rates):
+    """
+    Create dataframe, ordered by date then currency, from the rates of
+    each date.
+    """
+    rows = [
+        (pd.Timestamp(day), currency, rate)
+        for day, day_rates in rates.items()
+        for currency, rate in day_rates.items()
+    ]
+    df = pd.DataFrame.from_records(
+        rows, columns=["Date", "Currency", "ExRate"], index="Currency"
+    )
+    df.sort_values(["Date", "Currency"], inplace=True)
+    df.index.name = None
+    return df
 
 
 class FixerForexReader(Fixer):
@@ -30,6 +60,32 @@ class FixerForexReader(Fixer):
     api_key : str, optional
         Fixer.io API key . If not provided, the environment variable
         FIXERIO_API_KEY is read. The API key is *mandatory*.
+    cache : CacheBackend, optional
+        Cache of API responses, which may be shared between readers,
+        processes or nodes.
+    cache_ttl : float, default 3600
+        Time, in seconds, to cache the rates of the current UTC day.
+    cassette : Cassette, optional
+        Cassette recording the responses, or replaying them without
+        using the network.
+    deadline : float, optional
+        Time, in seconds, allowed for the request including its retries
+        and parsing. When it is exceeded the freshest cached rates of the
+        stale_days previous days are returned, with a "stale" entry in
+        the attrs of the DataFrame or the stale attribute of the
+        RateRecord set to True, or DeadlineExceeded is raised.
+    stale_days : int, default 7
+        Number of previous days searched in the cache when the deadline
+        is exceeded.
+    transport : Transport, optional
+        Transport sending the requests instead of the session, e.g. an
+        HTTP2Transport shared by many readers.
+    lazy : bool, default False
+        Return a LazyRateFrame of the rates from start to end, today if
+        not provided, fetching only the dates and currencies accessed.
+    raw : bool, default False
+        Return a RateRecord instead of a DataFrame, avoiding the cost of
+        building a DataFrame.
     """
 
     def __init__(
@@ -42,6 +98,14 @@ class FixerForexReader(Fixer):
         pause=0.1,
         session=None,
         api_key=None,
+        cache=None,
+        cache_ttl=3600,
+        cassette=None,
+        deadline=None,
+        stale_days=7,
+        transport=None,
+        lazy=False,
+        raw=False,
     ):
         super(FixerForexReader, self).__init__(
             base_currency=base_currency,
@@ -52,12 +116,22 @@ class FixerForexReader(Fixer):
             pause=pause,
             session=session,
             api_key=api_key,
+            cache=cache,
+            cache_ttl=cache_ttl,
+            cassette=cassette,
+            deadline=deadline,
+            stale_days=stale_days,
+            transport=transport,
         )
         self.optional_params = {}
         if isinstance(symbols, str):
             self.symbols = [symbols]
         else:
             self.symbols = symbols
+        if lazy and raw:
+            raise ValueError("lazy and raw cannot both be True")
+        self.lazy = lazy
+        self.raw = raw
 
     @property
     def url(self):
@@ -91,14 +165,149 @@ class FixerForexReader(Fixer):
         params.update(self.optional_params)
         return params
 
+    def read(self):
+        """
+        Read data from connector, or return a LazyRateFrame when lazy.
+        """
+        if not self.lazy:
+            return super(FixerForexReader, self).read()
+        from .lazy import LazyRateFrame
+
+        return LazyRateFrame(
+            self.start,
+            self.end,
+            symbols=self.symbols,
+            base=self.base_currency,
+            api_key=self.api_key,
+            timeseries=isinstance(self, FixerTimeseriesReader),
+            session=self.session,
+            retry_count=self.retry_count,
+            pause=self.pause,
+            cache=self.cache,
+            cassette=self.cassette,
+            transport=self.transport,
+        )
+
     def _read_lines(self, out):
         """
         Create dataframe from rates data returned by API call.
         """
         try:
-            df = pd.DataFrame.from_dict(out[self.data_key], orient="index", columns=['ExRate'])
+            rates = out[self.data_key]
         except KeyError:
             raise RemoteDataError()
-        df.insert(0, "Date", self.start)
-        df.sort_index(ascending=True, inplace=True)
+        if self.raw:
+            return RateRecord.from_response(out, self.start.date())
+        return _rates_frame(rates, self.start)
+
+    def _stale_keys(self, params):
+        """
+        Date and cache key of the stale_days before start, freshest first.
+        """
+        return stale_keys(params, self.start, self.stale_days)
+
+    def _read_stale(self, day, out):
+        """
+        Cached rates of a day before start, flagged as stale.
+        """
+        if self.raw:
+            record = RateRecord.from_response(out, day.date())
+            record.stale = True
+            return record
+        df = _rates_frame(out["rates"], day)
+        df.attrs["stale"] = True
         return df
+
+
+class FixerTimeseriesReader(FixerForexReader):
+    """
+    Returns DataFrame of the Fixer.io daily Foreign Exchange Rates
+    between two dates, using the timeseries endpoint.
+
+    Parameters
+    ----------
+    base_currency : str
+        The base currency code
+    symbols : str, array-like object (list, tuple, Series)
+        A single currency code or list of the currency codes.
+    start : string, int, date, datetime, Timestamp
+        Starting UTC date.
+    end : string, int, date, datetime, Timestamp
+        Ending UTC date. The Fixer.io timeseries endpoint allows a
+        maximum range of 365 days.
+    retry_count : int, default 3
+        Number of times to retry query request.
+    pause : int, default 0.1
+        Time, in seconds, to pause between retries.
+    session : Session, default None
+        requests.sessions.Session instance to be used
+    api_key : str, optional
+        Fixer.io API key . If not provided, the environment variable
+        FIXERIO_API_KEY is read. The API key is *mandatory*.
+    cache : CacheBackend, optional
+        Cache of API responses, which may be shared between readers,
+        processes or nodes.
+    cache_ttl : float, default 3600
+        Time, in seconds, to cache the rates of the current UTC day.
+    cassette : Cassette, optional
+        Cassette recording the responses, or replaying them without
+        using the network.
+    deadline : float, optional
+        Time, in seconds, allowed for the request including its retries
+        and parsing. DeadlineExceeded is raised when it is exceeded, as
+        timeseries are not served from the cache of daily rates.
+    stale_days : int, default 7
+        Unused, timeseries are never returned stale.
+    transport : Transport, optional
+        Transport sending the requests instead of the session, e.g. an
+        HTTP2Transport shared by many readers.
+    lazy : bool, default False
+        Return a LazyRateFrame of the rates from start to end, fetching
+        only the dates and currencies accessed with the timeseries
+        endpoint.
+    raw : bool, default False
+        Return a list of RateRecord, one per date, instead of a DataFrame.
+
+    Notes
+    -----
+    The timeseries endpoint is not available on the Fixer.io free plan.
+    """
+
+    @property
+    def function(self):
+        """
+        """
+        return "timeseries"
+
+    @property
+    def params(self):
+        """
+        Set parameters used for the API query string
+        """
+        params = super(FixerTimeseriesReader, self).params
+        params["start_date"] = self.start.strftime("%Y-%m-%d")
+        params["end_date"] = self.end.strftime("%Y-%m-%d")
+        return params
+
+    def _read_lines(self, out):
+        """
+        Create dataframe, ordered by date then currency, from the rates
+        data returned by API call.
+        """
+        try:
+            rates = out[self.data_key]
+        except KeyError:
+            raise RemoteDataError()
+        if self.raw:
+            base = out.get("base", "EUR")
+            return [
+                RateRecord.from_response(
+                    {"base": base, "date": day, "rates": rates[day]}
+                )
+                for day in sorted(rates)
+            ]
+        return _timeseries_frame(rates)
+
+    def _stale_keys(self, params):
+        """Timeseries are not served from the cache of daily rates"""
+        return []
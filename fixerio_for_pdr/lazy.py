@@ -0,0 +1,281 @@
+"""
+Dates by currencies rate frame fetched lazily, block by block.
+"""
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .batch import Lookup, read_batch
+
+
+class _LocIndexer(object):
+    def __init__(self, frame):
+        self._frame = frame
+
+    def __getitem__(self, key):
+        rows, columns = key if isinstance(key, tuple) else (key, slice(None))
+        return self._frame._slice(rows, columns).loc[key]
+
+
+class LazyRateFrame(object):
+    """
+    Daily rates indexed by date with a column per currency, fetched only
+    when touched.
+
+    The range is split into blocks of block_days dates by block_symbols
+    currencies. Slicing with loc, iterating with iterrows or aggregating
+    fetches the blocks touched, all missing blocks of one access in a
+    single batch, and keeps the max_blocks most recently used blocks.
+
+    Parameters
+    ----------
+    start, end : string, date, datetime, Timestamp
+        First and last UTC dates of the frame
+    symbols : str, array-like object, optional
+        Currency codes, the columns of the frame. All currencies are
+        fetched, as a single currency block, if not provided, until the
+        columns are read and the currencies known.
+    base : str, optional
+        The base currency code
+    block_days : int, default 30
+        Number of dates in each block
+    block_symbols : int, default 20
+        Number of currencies in each block
+    max_blocks : int, default 64
+        Maximum number of blocks kept in memory
+    **batch_kwargs
+        Additional keyword arguments passed to read_batch. With a
+        PublishingCalendar as calendar, days without published rates are
+        forward-filled and recorded in synthesized_dates.
+    """
+
+    def __init__(
+        self,
+        start,
+        end,
+        symbols=None,
+        base=None,
+        block_days=30,
+        block_symbols=20,
+        max_blocks=64,
+        **batch_kwargs
+    ):
+        self.index = pd.date_range(
+            pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize(), name="Date"
+        )
+        if isinstance(symbols, str):
+            symbols = [symbols]
+        self._symbols = list(symbols) if symbols else None
+        self.base = base
+        self.block_days = block_days
+        self.block_symbols = block_symbols
+        self.max_blocks = max_blocks
+        self.batch_kwargs = batch_kwargs
+        self._blocks = OrderedDict()
+        self.fetched_blocks = 0
+        self.synthesized_dates = set()
+
+    def __repr__(self):
+        return "<LazyRateFrame {} to {}, {} currencies, {} blocks in memory>".format(
+            self.index[0].date(),
+            self.index[-1].date(),
+            len(self._symbols) if self._symbols else "all",
+            len(self._blocks),
+        )
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    @property
+    def columns(self):
+        """Currency codes, fetching the first block if not known"""
+        if self._symbols is None:
+            self._split_blocks(list(self._slice(self.index[:1], slice(None)).columns))
+        return pd.Index(self._symbols)
+
+    @property
+    def shape(self):
+        return (len(self.index), len(self.columns))
+
+    @property
+    def loc(self):
+        """Label based selection, as DataFrame.loc"""
+        return _LocIndexer(self)
+
+    def _split_blocks(self, symbols):
+        """
+        Set the currency codes, splitting the memoized blocks of all
+        currencies into blocks of block_symbols currencies.
+        """
+        self._symbols = symbols
+        blocks = self._blocks
+        self._blocks = OrderedDict()
+        for (date_block, _), block in blocks.items():
+            for currency_block in range((len(symbols) - 1) // self.block_symbols + 1):
+                self._blocks[(date_block, currency_block)] = block.reindex(
+                    columns=self._block_symbols(currency_block)
+                )
+        while len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+
+    def _currency_blocks(self, columns):
+        """Currency block numbers holding the columns"""
+        if self._symbols is None:
+            return [0]
+        if isinstance(columns, slice):
+            positions = np.arange(len(self._symbols))[
+                self.columns.slice_indexer(columns.start, columns.stop, columns.step)
+            ]
+        else:
+            if isinstance(columns, str):
+                columns = [columns]
+            positions = self.columns.get_indexer(list(columns))
+            positions = positions[positions >= 0]
+        return sorted(set(positions // self.block_symbols))
+
+    def _block_symbols(self, currency_block):
+        if self._symbols is None:
+            return None
+        first = currency_block * self.block_symbols
+        return self._symbols[first : first + self.block_symbols]
+
+    def _block_dates(self, date_block):
+        first = date_block * self.block_days
+        return self.index[first : first + self.block_days]
+
+    def _fetch(self, keys):
+        """Fetch the blocks in one batch, returning them by key"""
+        lookups = []
+        for date_block, currency_block in keys:
+            symbols = self._block_symbols(currency_block)
+            lookups.extend(
+                Lookup(day, self.base, symbols) for day in self._block_dates(date_block)
+            )
+        frames = iter(read_batch(lookups, **self.batch_kwargs))
+        blocks = {}
+        for date_block, currency_block in keys:
+            dates = self._block_dates(date_block)
+            rows = {}
+            for day in dates:
+                frame = next(frames)
+                if frame.attrs.get("synthesized"):
+                    self.synthesized_dates.add(day)
+                rows[day] = frame["ExRate"]
+            block = pd.DataFrame.from_dict(rows, orient="index")
+            symbols = self._block_symbols(currency_block)
+            if symbols is not None:
+                block = block.reindex(columns=symbols)
+            block.index = dates
+            blocks[(date_block, currency_block)] = block
+        self.fetched_blocks += len(keys)
+        return blocks
+
+    def _get_blocks(self, date_blocks, currency_blocks):
+        """
+        Return the blocks, fetching the missing ones, and update the
+        memoized blocks.
+        """
+        keys = [(d, c) for d in date_blocks for c in currency_blocks]
+        blocks = {key: self._blocks[key] for key in keys if key in self._blocks}
+        missing = [key for key in keys if key not in blocks]
+        if missing:
+            blocks.update(self._fetch(missing))
+        for key in keys:
+            self._blocks[key] = blocks[key]
+            self._blocks.move_to_end(key)
+        while len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+        return blocks
+
+    def _row_positions(self, rows):
+        """First and last row positions covering the rows"""
+        if isinstance(rows, slice):
+            positions = np.arange(len(self.index))[
+                self.index.slice_indexer(rows.start, rows.stop, rows.step)
+            ]
+        elif isinstance(rows, (list, np.ndarray, pd.Index)):
+            positions = self.index.get_indexer(pd.DatetimeIndex(rows))
+            positions = positions[positions >= 0]
+        else:
+            positions = [self.index.get_loc(pd.Timestamp(rows))]
+        if len(positions) == 0:
+            return None
+        return min(positions), max(positions)
+
+    def _slice(self, rows, columns):
+        """
+        DataFrame of the blocks covering the rows and columns.
+        """
+        span = self._row_positions(rows)
+        currency_blocks = self._currency_blocks(columns)
+        if span is None or not currency_blocks:
+            return pd.DataFrame(index=self.index[:0], columns=self._symbols)
+        date_blocks = range(span[0] // self.block_days, span[1] // self.block_days + 1)
+        blocks = self._get_blocks(date_blocks, currency_blocks)
+        df = pd.concat(
+            [
+                pd.concat([blocks[(d, c)] for c in currency_blocks], axis=1)
+                for d in date_blocks
+            ]
+        )
+        df.index.name = "Date"
+        return df
+
+    def iter_blocks(self, columns=slice(None)):
+        """
+        Iterate over the frame one date block at a time.
+
+        Yields
+        ------
+        DataFrame
+        """
+        currency_blocks = self._currency_blocks(columns)
+        for date_block in range((len(self.index) - 1) // self.block_days + 1):
+            blocks = self._get_blocks([date_block], currency_blocks)
+            df = pd.concat([blocks[(date_block, c)] for c in currency_blocks], axis=1)
+            df.index.name = "Date"
+            yield df if isinstance(columns, slice) else df[columns]
+
+    def iterrows(self):
+        """
+        Iterate over the rows as (date, Series) pairs, fetching one date
+        block at a time.
+        """
+        for block in self.iter_blocks():
+            for row in block.iterrows():
+                yield row
+
+    def _aggregate(self, partial, combine):
+        return combine(pd.DataFrame([partial(block) for block in self.iter_blocks()]))
+
+    def count(self):
+        """Number of rates of each currency"""
+        return self._aggregate(lambda df: df.count(), lambda df: df.sum())
+
+    def sum(self):
+        """Sum of the rates of each currency"""
+        return self._aggregate(lambda df: df.sum(), lambda df: df.sum())
+
+    def mean(self):
+        """Mean rate of each currency"""
+        sums, counts = [], []
+        for block in self.iter_blocks():
+            sums.append(block.sum())
+            counts.append(block.count())
+        return pd.DataFrame(sums).sum() / pd.DataFrame(counts).sum()
+
+    def min(self):
+        """Minimum rate of each currency"""
+        return self._aggregate(lambda df: df.min(), lambda df: df.min())
+
+    def max(self):
+        """Maximum rate of each currency"""
+        return self._aggregate(lambda df: df.max(), lambda df: df.max())
+
+    def to_frame(self):
+        """Fetch and return the whole frame"""
+        return self._slice(slice(None), slice(None))
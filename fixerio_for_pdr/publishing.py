@@ -0,0 +1,134 @@
+"""
+Calendar of the days on which new daily rates are published.
+
+Fixer.io answers historical requests for every date, but on days when
+its reference sources do not publish the rates of the previous day are
+repeated. Range and sync fetches use a PublishingCalendar to request only
+publishing days and forward-fill the others.
+"""
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+_WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def _date(value):
+    return pd.Timestamp(value).date()
+
+
+class PublishingCalendar(object):
+    """
+    Days on which new rates are published, configured or learned from
+    the responses.
+
+    Without a weekmask the calendar learns which weekdays repeat the
+    rates of the day before: a weekday is skipped once it has been seen
+    repeating min_observations times and never seen publishing.
+
+    Parameters
+    ----------
+    weekmask : str, optional
+        Publishing weekdays, e.g. "Mon Tue Wed Thu Fri". Learned from
+        the responses if not provided.
+    holidays : list of string, date, datetime, Timestamp, optional
+        Dates on which rates are not published
+    min_observations : int, default 3
+        Number of repeating days of a weekday needed to skip it
+    max_lookback : int, default 7
+        Maximum number of days a rate is forward-filled
+    """
+
+    def __init__(
+        self, weekmask=None, holidays=None, min_observations=3, max_lookback=7
+    ):
+        if weekmask is not None:
+            names = weekmask.split()
+            unknown = set(names) - set(_WEEKDAYS)
+            if unknown:
+                raise ValueError("Unknown weekdays {}".format(sorted(unknown)))
+            weekmask = frozenset(_WEEKDAYS.index(name) for name in names)
+        self.weekmask = weekmask
+        self.holidays = frozenset(_date(day) for day in holidays or ())
+        self.min_observations = min_observations
+        self.max_lookback = max_lookback
+        self._repeated = [0] * 7
+        self._published = [0] * 7
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "<PublishingCalendar skipped weekdays: {}>".format(
+            " ".join(
+                _WEEKDAYS[wd] for wd in range(7) if not self._weekday_publishes(wd)
+            )
+            or "none"
+        )
+
+    def _weekday_publishes(self, weekday):
+        if self.weekmask is not None:
+            return weekday in self.weekmask
+        return (
+            self._repeated[weekday] < self.min_observations
+            or self._published[weekday] > 0
+        )
+
+    def publishes(self, day):
+        """True if new rates are, or may be, published on day"""
+        day = _date(day)
+        return day not in self.holidays and self._weekday_publishes(day.weekday())
+
+    def source_date(self, day):
+        """
+        Date whose rates are those of day: the latest publishing date no
+        more than max_lookback days before day, or day itself.
+        """
+        day = _date(day)
+        for n in range(self.max_lookback + 1):
+            source = day - timedelta(days=n)
+            if self.publishes(source):
+                return source
+        return day
+
+    def observe(self, day, rates, timestamp=None, previous=None):
+        """
+        Learn from the rates of a day.
+
+        The rates repeat those of the day before if their timestamp is of
+        an earlier date, or if they equal the previous rates.
+
+        Parameters
+        ----------
+        day : string, date, datetime, Timestamp
+            Date of the rates
+        rates : dict
+            Rate of each currency code
+        timestamp : int, optional
+            UNIX timestamp of the rates, as returned by Fixer.io
+        previous : dict, optional
+            Rates of the day before, if known
+        """
+        day = _date(day)
+        repeated = None
+        if timestamp and datetime.utcfromtimestamp(timestamp).date() < day:
+            repeated = True
+        elif previous is not None:
+            common = set(rates) & set(previous)
+            if common:
+                repeated = all(rates[c] == previous[c] for c in common)
+        if repeated is None:
+            return
+        with self._lock:
+            if repeated:
+                self._repeated[day.weekday()] += 1
+            else:
+                self._published[day.weekday()] += 1
@@ -0,0 +1,104 @@
+"""
+Compact rates of one date, for callers that do not need a DataFrame.
+"""
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from datetime import datetime
+
+import pandas as pd
+
+
+class RateRecord(Mapping):
+    """
+    Read-only mapping of currency code to rate of one date.
+
+    The currency codes are held sorted in a tuple and the rates in an
+    array of doubles, so a record is built without pandas and converted
+    to the DataFrame returned by the readers only on demand.
+
+    Parameters
+    ----------
+    date : date
+        Date of the rates
+    base : str
+        The base currency code
+    timestamp : int
+        UNIX time of the rates, 0 if not known
+    currencies : tuple of str
+        Sorted currency codes
+    rates : array
+        Rate of each currency
+    stale : bool, default False
+        True if the rates are cached rates of an earlier date, returned
+        because the deadline of the request was exceeded.
+    """
+
+    __slots__ = ("date", "base", "timestamp", "currencies", "rates", "stale")
+
+    def __init__(self, date, base, timestamp, currencies, rates, stale=False):
+        self.date = date
+        self.base = base
+        self.timestamp = timestamp
+        self.currencies = currencies
+        self.rates = rates
+        self.stale = stale
+
+    @classmethod
+    def from_response(cls, out, day=None, stale=False):
+        """
+        Create record from a Fixer.io rates response.
+
+        Parameters
+        ----------
+        out : dict
+            Response of the latest or historical endpoint
+        day : date, optional
+            Date of the rates, the date of the response if not provided
+        stale : bool, default False
+            True if the rates are cached rates returned late
+        """
+        rates = out["rates"]
+        currencies = tuple(sorted(rates))
+        if day is None and out.get("date"):
+            day = datetime.strptime(out["date"], "%Y-%m-%d").date()
+        return cls(
+            day,
+            out.get("base", "EUR"),
+            out.get("timestamp") or 0,
+            currencies,
+            array("d", [rates[c] for c in currencies]),
+            stale,
+        )
+
+    def __repr__(self):
+        return "<RateRecord {}{} {}: {}>".format(
+            self.date,
+            " (stale)" if self.stale else "",
+            self.base,
+            ", ".join(
+                "{}={}".format(c, r) for c, r in zip(self.currencies, self.rates)
+            ),
+        )
+
+    def __getitem__(self, currency):
+        i = bisect_left(self.currencies, currency)
+        if i == len(self.currencies) or self.currencies[i] != currency:
+            raise KeyError(currency)
+        return self.rates[i]
+
+    def __iter__(self):
+        return iter(self.currencies)
+
+    def __len__(self):
+        return len(self.currencies)
+
+    def to_frame(self):
+        """
+        DataFrame indexed by currency, as returned by FixerForexReader.
+        """
+        df = pd.DataFrame(
+            {"ExRate": self.rates}, index=pd.Index(self.currencies), dtype="float64"
+        )
+        df.insert(0, "Date", pd.Timestamp(self.date))
+        return df
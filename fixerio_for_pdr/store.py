@@ -0,0 +1,175 @@
+"""
+Local store of daily Fixer.io rates.
+"""
+import sqlite3
+
+import pandas as pd
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS days (
+    base TEXT NOT NULL,
+    date TEXT NOT NULL,
+    timestamp INTEGER,
+    synthesized INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (base, date)
+);
+CREATE TABLE IF NOT EXISTS rates (
+    base TEXT NOT NULL,
+    date TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    rate REAL NOT NULL,
+    PRIMARY KEY (base, date, currency)
+);
+"""
+
+
+def _day(value):
+    """ISO format date string of a date like value"""
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+class RateStore(object):
+    """
+    SQLite backed store of daily rates, safe to share between processes.
+
+    Parameters
+    ----------
+    path : str
+        Path of the SQLite database file, created if it does not exist.
+    timeout : float, default 30
+        Time, in seconds, to wait for another process to release the
+        database before failing.
+    """
+
+    def __init__(self, path, timeout=30):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=timeout)
+        # Write ahead logging lets readers proceed while a worker writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(days)")]
+        if "synthesized" not in columns:
+            # Stores created before synthesized days were recorded
+            with self._conn:
+                self._conn.execute(
+                    "ALTER TABLE days ADD COLUMN synthesized INTEGER NOT NULL DEFAULT 0"
+                )
+
+    def close(self):
+        """Close the database connection"""
+        self._conn.close()
+
+    def write(self, base, date, rates, timestamp=None, synthesized=False):
+        """
+        Store the rates of one day.
+
+        Parameters
+        ----------
+        base : str
+            The base currency code
+        date : string, date, datetime, Timestamp
+            UTC date of the rates
+        rates : dict
+            Rate of each currency code
+        timestamp : int, optional
+            UNIX timestamp of the rates, as returned by Fixer.io
+        synthesized : bool, default False
+            True if the rates were forward-filled from an earlier day
+            instead of fetched
+        """
+        day = _day(date)
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO days VALUES (?, ?, ?, ?)",
+                (base, day, timestamp, int(synthesized)),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO rates VALUES (?, ?, ?, ?)",
+                [(base, day, currency, rate) for currency, rate in rates.items()],
+            )
+
+    def dates(self, base="EUR", start=None, end=None, synthesized=None):
+        """
+        Sorted list of the stored dates, between start and end inclusive
+        when provided. Only the synthesized, or only the fetched, dates
+        are listed when synthesized is True, or False.
+        """
+        query = "SELECT date FROM days WHERE base = ?"
+        args = [base]
+        if synthesized is not None:
+            query += " AND synthesized = ?"
+            args.append(int(synthesized))
+        if start is not None:
+            query += " AND date >= ?"
+            args.append(_day(start))
+        if end is not None:
+            query += " AND date <= ?"
+            args.append(_day(end))
+        rows = self._conn.execute(query + " ORDER BY date", args).fetchall()
+        return [pd.Timestamp(row[0]).date() for row in rows]
+
+    def missing_dates(self, start, end, base="EUR", symbols=None):
+        """
+        Sorted list of the dates between start and end inclusive that
+        are not stored, or when symbols are provided, that miss the rate
+        of any of the currencies.
+        """
+        if symbols is None:
+            stored = set(self.dates(base, start, end))
+        else:
+            if isinstance(symbols, str):
+                symbols = [symbols]
+            symbols = sorted(set(symbols))
+            rows = self._conn.execute(
+                "SELECT date FROM rates WHERE base = ? AND date >= ? AND date <= ?"
+                " AND currency IN ({}) GROUP BY date HAVING COUNT(*) = ?".format(
+                    ",".join("?" * len(symbols))
+                ),
+                [base, _day(start), _day(end)] + symbols + [len(symbols)],
+            ).fetchall()
+            stored = set(pd.Timestamp(row[0]).date() for row in rows)
+        return [
+            day.date()
+            for day in pd.date_range(_day(start), _day(end))
+            if day.date() not in stored
+        ]
+
+    def read(self, base="EUR", start=None, end=None, symbols=None):
+        """
+        Read the stored rates.
+
+        Parameters
+        ----------
+        base : str, default EUR
+            The base currency code
+        start, end : string, date, datetime, Timestamp, optional
+            First and last dates to read, inclusive
+        symbols : str, array-like object, optional
+            A single currency code or list of the currency codes. All
+            stored currencies are read if not provided.
+
+        Returns
+        -------
+        DataFrame
+            Rates indexed by date with a column per currency.
+        """
+        query = "SELECT date, currency, rate FROM rates WHERE base = ?"
+        args = [base]
+        if start is not None:
+            query += " AND date >= ?"
+            args.append(_day(start))
+        if end is not None:
+            query += " AND date <= ?"
+            args.append(_day(end))
+        if symbols is not None:
+            if isinstance(symbols, str):
+                symbols = [symbols]
+            symbols = list(symbols)
+            query += " AND currency IN ({})".format(",".join("?" * len(symbols)))
+            args.extend(symbols)
+        rows = pd.read_sql_query(query, self._conn, params=args)
+        df = rows.pivot(index="date", columns="currency", values="rate")
+        df.index = pd.to_datetime(df.index)
+        df.index.name = "Date"
+        df.columns.name = None
+        return df.sort_index()
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+import pandas_datareader as pdr
+
+
+class MockResponse:
+    def __init__(self, response={}, status_code=200):
+        self.mock_response = response
+        self.status_code = status_code
+        self.content = json.dumps(response).encode("utf-8")
+
+    def json(self):
+        """
+        Mock json() method returns the init response like dict
+        """
+        return self.mock_response
+
+
+def historical_response(day, rates, base="EUR", timestamp=1620189484):
+    """
+    Response of the historical endpoint serving rates on day, without
+    timestamp if None
+    """
+    response = {
+        "success": True,
+        "timestamp": timestamp,
+        "historical": True,
+        "base": base,
+        "date": day,
+        "rates": rates,
+    }
+    if timestamp is None:
+        del response["timestamp"]
+    return response
+
+
+@pytest.fixture
+def mock_api(monkeypatch):
+    """
+    Mock the API endpoint of the readers: mock_api(respond) serves the
+    response respond(url, params) to every request, and returns the list
+    of the (url, params) requested.
+    """
+
+    def install(respond):
+        calls = []
+
+        def mock_get_response(self, url, params=None, headers=None):
+            params = dict(params or {})
+            calls.append((url, params))
+            return MockResponse(respond(url, params))
+
+        monkeypatch.setattr(pdr.base._BaseReader, "_get_response", mock_get_response)
+        return calls
+
+    return install
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fixerio_for_pdr import RateHistory, RateStore
+from fixerio_for_pdr.tests.conftest import historical_response
+
+TEST_API_KEY = "af3f0000fffefddc5d48f5879c0fefe"  # Not a real key
+
+
+@pytest.fixture
+def api_calls(mock_api):
+    """
+    Serve AUD and USD rates derived from the day of month, recording the
+    URL and parameters of each call.
+    """
+
+    def respond(url, params):
+        day = url.rsplit("/", 1)[-1]
+        return historical_response(
+            day, {"AUD": 1.5 + int(day[-2:]) / 100, "USD": 1.2}, timestamp=None
+        )
+
+    return mock_api(respond)
+
+
+@pytest.fixture
+def store(tmp_path):
+    """
+    Rate store holding the AUD and USD rates of January 2021, except
+    January 30th.
+    """
+    store = RateStore(str(tmp_path / "rates.sqlite"))
+    for day in pd.date_range("2021-01-01", "2021-01-31"):
+        if day.day != 30:
+            store.write("EUR", day, {"AUD": 1.5 + day.day / 100, "USD": 1.2})
+    return store
+
+
+class TestRateHistory(object):
+    """
+    Test analytics over a local rate store using mock api endpoint
+    """
+
+    def test_stored_rates_do_not_call_api(self, store, api_calls):
+        """
+        GIVEN a store holding every date of a range
+        WHEN the rates of the range are requested
+        THEN the API is not called
+        """
+        df = RateHistory(store, api_key=TEST_API_KEY).rates(
+            "2021-01-01", "2021-01-29", "AUD"
+        )
+        assert len(df.index) == 29
+        assert api_calls == []
+
+    def test_missing_dates_are_fetched_and_stored(self, store, api_calls):
+        """
+        GIVEN a store missing January 30th and all of February
+        WHEN the rates up to February 2nd are requested twice
+        THEN the 3 missing dates are fetched once and then read locally
+        """
+        history = RateHistory(store, api_key=TEST_API_KEY)
+        history.rates("2021-01-01", "2021-02-02")
+        df = history.rates("2021-01-01", "2021-02-02")
+        assert sorted(url.rsplit("/", 1)[-1] for url, _ in api_calls) == [
+            "2021-01-30",
+            "2021-02-01",
+            "2021-02-02",
+        ]
+        assert len(df.index) == 33
+        assert df.loc["2021-02-02", "AUD"] == pytest.approx(1.52)
+
+    def test_dates_missing_a_currency_are_fetched(self, store, api_calls):
+        """
+        GIVEN a store holding only the USD rates of February 1st to 3rd
+        WHEN the AUD rates, then the AUD change, of those dates are
+        requested
+        THEN the 3 dates are fetched in one batch, and then read locally
+        """
+        for day in ("2021-02-01", "2021-02-02", "2021-02-03"):
+            store.write("EUR", day, {"USD": 1.2})
+        history = RateHistory(store, api_key=TEST_API_KEY)
+        history.rates("2021-02-01", "2021-02-03", "AUD")
+        df = history.rates("2021-02-01", "2021-02-03", ["AUD", "USD"])
+        change = history.change("2021-02-01", "2021-02-03", "AUD")
+        assert sorted(url.rsplit("/", 1)[-1] for url, _ in api_calls) == [
+            "2021-02-01",
+            "2021-02-02",
+            "2021-02-03",
+        ]
+        assert list(df["AUD"]) == pytest.approx([1.51, 1.52, 1.53])
+        assert change.loc["AUD", "change"] == pytest.approx(0.02)
+
+    def test_without_fetch_missing_dates_are_absent(self, store, api_calls):
+        """
+        GIVEN a store missing January 30th and fetching disabled
+        WHEN the rates of January are requested
+        THEN the API is not called and January 30th is absent
+        """
+        df = RateHistory(store, fetch=False).rates("2021-01-01", "2021-01-31")
+        assert api_calls == []
+        assert pd.Timestamp("2021-01-30") not in df.index
+
+    def test_change_between_dates(self, store, api_calls):
+        """
+        GIVEN stored rates on two dates
+        WHEN the change between the dates is requested
+        THEN the change and percent change of each currency is returned
+        """
+        df = RateHistory(store, fetch=False).change("2021-01-01", "2021-01-11")
+        assert list(df.index) == ["AUD", "USD"]
+        assert df.loc["AUD", "start_rate"] == pytest.approx(1.51)
+        assert df.loc["AUD", "end_rate"] == pytest.approx(1.61)
+        assert df.loc["AUD", "change"] == pytest.approx(0.1)
+        assert df.loc["AUD", "change_pct"] == pytest.approx(0.1 / 1.51 * 100)
+        assert df.loc["USD", "change"] == 0
+
+    def test_weekly_ohlc(self, store):
+        """
+        GIVEN a week of stored rates
+        WHEN the rates are resampled weekly as ohlc
+        THEN the open, high, low and close of each currency is returned
+        """
+        df = RateHistory(store, fetch=False).resample(
+            "W", "2021-01-04", "2021-01-10", "AUD", how="ohlc"
+        )
+        assert len(df.index) == 1
+        assert df.iloc[0][("AUD", "open")] == pytest.approx(1.54)
+        assert df.iloc[0][("AUD", "high")] == pytest.approx(1.60)
+        assert df.iloc[0][("AUD", "low")] == pytest.approx(1.54)
+        assert df.iloc[0][("AUD", "close")] == pytest.approx(1.60)
+
+    def test_monthly_mean(self, store):
+        """
+        GIVEN a month of stored rates
+        WHEN the rates are resampled monthly
+        THEN the mean rate of each currency is returned
+        """
+        df = RateHistory(store, fetch=False).resample("M", "2021-01-01", "2021-01-31")
+        assert df.loc["2021-01-31", "USD"] == pytest.approx(1.2)
+
+    def test_rolling_volatility(self, store):
+        """
+        GIVEN stored rates
+        WHEN the 5 day rolling volatility is requested
+        THEN the standard deviation of the log returns is returned
+        """
+        df = RateHistory(store, fetch=False).volatility(5, "2021-01-01", "2021-01-10")
+        returns = np.log(1.5 + np.arange(1, 11) / 100)
+        returns = np.diff(returns)
+        assert np.isnan(df["AUD"].iloc[4])
+        assert df["AUD"].iloc[5] == pytest.approx(np.std(returns[:5], ddof=1))
+        assert df["USD"].iloc[-1] == 0
@@ -0,0 +1,178 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from pandas_datareader._utils import RemoteDataError
+from fixerio_for_pdr import RateStore
+from fixerio_for_pdr.backfill import (
+    Checkpoint,
+    _backfill_partition,
+    _init_worker,
+    backfill,
+    main,
+    partition_dates,
+)
+from fixerio_for_pdr.tests.conftest import historical_response
+
+TEST_API_KEY = "af3f0000fffefddc5d48f5879c0fefe"  # Not a real key
+
+
+@pytest.fixture
+def api_calls(mock_api):
+    """
+    Serve an AUD rate derived from the day of month. Dates in
+    March 2021 are not served, to check they are never requested.
+    """
+
+    def respond(url, params):
+        day = url.rsplit("/", 1)[-1]
+        assert not day.startswith("2021-03")
+        return historical_response(day, {"AUD": 1.5 + int(day[-2:]) / 100})
+
+    return mock_api(respond)
+
+
+class TestFixerBackfill(object):
+    """
+    Test the backfill of a rate store using mock api endpoint
+    """
+
+    def test_partition_dates(self):
+        """
+        GIVEN a date range of 10 days
+        WHEN it is partitioned in 4 day partitions
+        THEN 3 consecutive partitions covering the range are returned
+        """
+        partitions = partition_dates("2021-01-01", "2021-01-10", 4)
+        assert partitions == [
+            (date(2021, 1, 1), date(2021, 1, 4)),
+            (date(2021, 1, 5), date(2021, 1, 8)),
+            (date(2021, 1, 9), date(2021, 1, 10)),
+        ]
+
+    def test_checkpoint_is_persisted(self, tmp_path):
+        """
+        GIVEN a checkpoint with a partition marked done
+        WHEN the checkpoint file is loaded again
+        THEN the partition is done
+        """
+        path = str(tmp_path / "backfill.checkpoint")
+        partition = (date(2021, 1, 1), date(2021, 1, 4))
+        Checkpoint(path).mark_done(partition)
+        assert Checkpoint(path).is_done(partition)
+        assert not Checkpoint(path).is_done((date(2021, 1, 5), date(2021, 1, 8)))
+
+    def test_partition_skips_stored_dates(self, tmp_path, api_calls):
+        """
+        GIVEN a store already holding one date of a partition
+        WHEN the partition is backfilled
+        THEN only the other dates are fetched
+        """
+        store_path = str(tmp_path / "rates.sqlite")
+        store = RateStore(store_path)
+        store.write("EUR", "2021-01-02", {"AUD": 1.0})
+        _init_worker(store_path, TEST_API_KEY, 0, 0)
+        partition = (date(2021, 1, 1), date(2021, 1, 3))
+        assert _backfill_partition(partition, None, ["AUD"]) == (partition, 2)
+        df = store.read()
+        assert list(df["AUD"]) == pytest.approx([1.51, 1.0, 1.53])
+
+    def test_partition_rejects_other_base(self, tmp_path, api_calls):
+        """
+        GIVEN an API answering in EUR base
+        WHEN a partition is backfilled in USD base
+        THEN an exception is raised and nothing is stored
+        """
+        store_path = str(tmp_path / "rates.sqlite")
+        _init_worker(store_path, TEST_API_KEY, 0, 0)
+        partition = (date(2021, 1, 1), date(2021, 1, 3))
+        with pytest.raises(RemoteDataError):
+            _backfill_partition(partition, "USD", ["AUD"])
+        assert len(api_calls) == 1
+        assert RateStore(store_path).dates() == []
+        assert RateStore(store_path).dates(base="USD") == []
+
+    def test_backfill_resumes_from_checkpoint(self, tmp_path, api_calls):
+        """
+        GIVEN a checkpoint recording the March 2021 partition as done
+        WHEN February to March 2021 is backfilled with two workers
+        THEN only the February dates are fetched and stored
+        """
+        store_path = str(tmp_path / "rates.sqlite")
+        checkpoint = Checkpoint(store_path + ".checkpoint")
+        for partition in partition_dates("2021-02-01", "2021-03-31", 14):
+            if partition[0].month == 3:
+                checkpoint.mark_done(partition)
+        progress = []
+        fetched = backfill(
+            "2021-02-01",
+            "2021-03-31",
+            store_path,
+            workers=2,
+            partition_days=14,
+            api_key=TEST_API_KEY,
+            progress=lambda *args: progress.append(args),
+        )
+        assert fetched == 28
+        assert progress[-1][0] == progress[-1][1]
+        store = RateStore(store_path)
+        assert store.dates()[0] == date(2021, 2, 1)
+        assert store.dates()[-1] == date(2021, 2, 28)
+        assert store.missing_dates("2021-02-01", "2021-02-28") == []
+
+    def test_backfill_other_base_and_symbols(self, tmp_path, mock_api):
+        """
+        GIVEN a store backfilled with the AUD rates of 10 days in EUR base
+        WHEN the same days are backfilled in USD base, then with GBP rates
+        THEN every day is fetched again for each and all rates are stored
+        """
+
+        def respond(url, params):
+            day = url.rsplit("/", 1)[-1]
+            rates = {"AUD": 1.5, "GBP": 0.9}
+            return historical_response(
+                day,
+                {c: rates[c] for c in params["symbols"].split(",")},
+                base=params.get("base", "EUR"),
+            )
+
+        mock_api(respond)
+        store_path = str(tmp_path / "rates.sqlite")
+        kwargs = dict(workers=1, api_key=TEST_API_KEY, progress=None)
+        args = ("2021-01-01", "2021-01-10", store_path)
+        assert backfill(*args, symbols="AUD", **kwargs) == 10
+        assert backfill(*args, base="USD", symbols="AUD", **kwargs) == 10
+        assert backfill(*args, symbols=["GBP", "AUD"], **kwargs) == 10
+        assert backfill(*args, symbols="AUD", **kwargs) == 0
+        store = RateStore(store_path)
+        assert len(store.dates(base="USD")) == 10
+        df = store.read(symbols=["AUD", "GBP"])
+        assert df.shape == (10, 2)
+        assert df.notna().all().all()
+
+    def test_main_backfills_store(self, tmp_path, api_calls, monkeypatch):
+        """
+        GIVEN the fixerio-backfill command line arguments for 3 days
+        WHEN the console script is run
+        THEN the 3 days are stored
+        """
+        monkeypatch.setenv("FIXERIO_API_KEY", TEST_API_KEY)
+        store_path = str(tmp_path / "rates.sqlite")
+        assert (
+            main(
+                [
+                    "2021-01-01",
+                    "2021-01-03",
+                    "--store",
+                    store_path,
+                    "--symbols",
+                    "AUD",
+                    "--workers",
+                    "1",
+                ]
+            )
+            == 0
+        )
+        df = RateStore(store_path).read(symbols="AUD")
+        assert list(df.index) == list(pd.date_range("2021-01-01", "2021-01-03"))
@@ -0,0 +1,211 @@
+from datetime import date
+
+import pandas as pd
+from pandas.testing import assert_index_equal
+import pytest
+
+from fixerio_for_pdr import Lookup, plan_batch, read_batch
+
+TEST_API_KEY = "af3f0000fffefddc5d48f5879c0fefe"  # Not a real key
+
+EUR_RATES = {
+    "2021-05-03": {"AUD": 1.55, "GBP": 0.87, "USD": 1.2, "SGD": 1.6},
+    "2021-05-04": {"AUD": 1.56, "GBP": 0.86, "USD": 1.25, "SGD": 1.61},
+    "2021-05-05": {"AUD": 1.54, "GBP": 0.85, "USD": 1.22, "SGD": 1.62},
+}
+
+
+@pytest.fixture
+def api_calls(mock_api):
+    """
+    Serve EUR_RATES from the historical and timeseries endpoints,
+    recording the URL and parameters of each call.
+    """
+
+    def respond(url, params):
+        symbols = params.get("symbols")
+
+        def select(rates):
+            if symbols is None:
+                return dict(rates)
+            return {s: rates[s] for s in symbols.split(",") if s in rates}
+
+        if url.endswith("timeseries"):
+            days = pd.date_range(params["start_date"], params["end_date"])
+            return {
+                "success": True,
+                "timeseries": True,
+                "base": "EUR",
+                "rates": {
+                    day: select(EUR_RATES[day])
+                    for day in days.strftime("%Y-%m-%d")
+                    if day in EUR_RATES
+                },
+            }
+        day = url.rsplit("/", 1)[-1]
+        return {
+            "success": True,
+            "historical": True,
+            "base": "EUR",
+            "date": day,
+            "rates": select(EUR_RATES[day]),
+        }
+
+    return mock_api(respond)
+
+
+class TestFixerBatchPlan(object):
+    """
+    Test planning of batch lookups
+    """
+
+    def test_lookups_on_same_date_share_one_call(self):
+        """
+        GIVEN lookups for several bases and symbols on the same date
+        WHEN the batch is planned with cross rates
+        THEN a single historical call for the union of symbols is planned
+        """
+        plan = plan_batch(
+            [
+                Lookup("2021-05-04", symbols="AUD"),
+                Lookup("2021-05-04", "USD", ["GBP"]),
+                ("2021-05-04", "EUR", "SGD"),
+            ]
+        )
+        assert plan.call_count == 1
+        assert plan.estimated_cost == 1
+        call = plan.calls[0]
+        assert call.function == "historical"
+        assert call.base == "EUR"
+        assert call.symbols == ("AUD", "GBP", "SGD", "USD")
+
+    def test_lookup_for_all_symbols_requests_all_currencies(self):
+        """
+        GIVEN a lookup with no symbols and another with symbols on the same date
+        WHEN the batch is planned
+        THEN the call requests all currencies
+        """
+        plan = plan_batch([Lookup("2021-05-04"), Lookup("2021-05-04", symbols="AUD")])
+        assert plan.call_count == 1
+        assert plan.calls[0].symbols is None
+
+    def test_without_cross_rates_calls_are_grouped_by_base(self):
+        """
+        GIVEN lookups for two bases on the same date
+        WHEN the batch is planned without cross rates
+        THEN one call per base is planned
+        """
+        plan = plan_batch(
+            [Lookup("2021-05-04", "USD", "AUD"), Lookup("2021-05-04", "EUR", "AUD")],
+            cross_rates=False,
+        )
+        assert plan.call_count == 2
+        assert sorted(call.base for call in plan.calls) == ["EUR", "USD"]
+
+    def test_timeseries_window_replaces_consecutive_dates(self):
+        """
+        GIVEN lookups on three consecutive dates and one distant date
+        WHEN the batch is planned with the timeseries endpoint
+        THEN one timeseries call and one historical call are planned
+        """
+        plan = plan_batch(
+            [
+                Lookup("2021-05-03", symbols="AUD"),
+                Lookup("2021-05-04", symbols="GBP"),
+                Lookup("2021-05-05", symbols="AUD"),
+                Lookup("2021-09-01", symbols="AUD"),
+            ],
+            timeseries=True,
+        )
+        assert [call.function for call in plan.calls] == ["timeseries", "historical"]
+        assert plan.calls[0].start == date(2021, 5, 3)
+        assert plan.calls[0].end == date(2021, 5, 5)
+        assert plan.calls[0].symbols == ("AUD", "GBP")
+
+    def test_timeseries_not_used_when_it_does_not_pay_off(self):
+        """
+        GIVEN consecutive dates and a timeseries call costing more than the
+        historical calls it would replace
+        WHEN the batch is planned
+        THEN only historical calls are planned
+        """
+        plan = plan_batch(
+            [Lookup("2021-05-03"), Lookup("2021-05-04")],
+            timeseries=True,
+            call_costs={"timeseries": 5},
+        )
+        assert [call.function for call in plan.calls] == ["historical", "historical"]
+        assert plan.estimated_cost == 2
+
+
+class TestFixerBatchRead(object):
+    """
+    Test running batch lookups using mock api endpoint
+    """
+
+    def test_dry_run_returns_plan_without_calling_api(self, api_calls):
+        """
+        GIVEN a list of lookups
+        WHEN read_batch is called as a dry run
+        THEN the plan is returned and the API is not called
+        """
+        plan = read_batch(
+            [Lookup("2021-05-03"), Lookup("2021-05-04")],
+            api_key=TEST_API_KEY,
+            dry_run=True,
+        )
+        assert plan.call_count == 2
+        assert api_calls == []
+
+    def test_results_are_scattered_to_lookups_in_order(self, api_calls):
+        """
+        GIVEN lookups on two dates
+        WHEN read_batch is called
+        THEN one call per date is made and a dataframe is returned per lookup
+        """
+        frames = read_batch(
+            [
+                Lookup("2021-05-04", symbols=["USD", "AUD"]),
+                Lookup("2021-05-03", symbols="GBP"),
+                Lookup("2021-05-04", symbols="SGD"),
+            ],
+            api_key=TEST_API_KEY,
+        )
+        assert len(api_calls) == 2
+        assert len(frames) == 3
+        assert_index_equal(frames[0].index, pd.Index(["AUD", "USD"]))
+        assert frames[0].loc["USD", "ExRate"] == 1.25
+        assert frames[0].iloc[0]["Date"] == pd.Timestamp("2021-05-04")
+        assert frames[1].loc["GBP", "ExRate"] == 0.87
+        assert frames[2].loc["SGD", "ExRate"] == 1.61
+
+    def test_non_euro_base_uses_cross_rates(self, api_calls):
+        """
+        GIVEN a lookup with a USD base
+        WHEN read_batch is called
+        THEN the rates are derived from the EUR rates without a base parameter
+        """
+        frames = read_batch(
+            [Lookup("2021-05-04", "USD", ["AUD", "EUR"])], api_key=TEST_API_KEY
+        )
+        url, params = api_calls[0]
+        assert "base" not in params
+        assert params["symbols"] == "AUD,USD"
+        assert frames[0].loc["AUD", "ExRate"] == pytest.approx(1.56 / 1.25)
+        assert frames[0].loc["EUR", "ExRate"] == pytest.approx(1 / 1.25)
+
+    def test_timeseries_results_are_scattered_by_date(self, api_calls):
+        """
+        GIVEN lookups on consecutive dates
+        WHEN read_batch is called with the timeseries endpoint
+        THEN a single call is made and each lookup receives its date's rates
+        """
+        frames = read_batch(
+            [Lookup("2021-05-05", symbols="AUD"), Lookup("2021-05-03", symbols="AUD")],
+            api_key=TEST_API_KEY,
+            timeseries=True,
+        )
+        assert len(api_calls) == 1
+        assert api_calls[0][0].endswith("timeseries")
+        assert frames[0].loc["AUD", "ExRate"] == 1.54
+        assert frames[1].loc["AUD", "ExRate"] == 1.55
@@ -0,0 +1,219 @@
+import socketserver
+import threading
+from datetime import datetime
+
+import pytest
+
+from fixerio_for_pdr import (
+    FIXERIO_BASE_URL,
+    FileCache,
+    FixerClient,
+    FixerForexReader,
+    MemcachedCache,
+    MemoryCache,
+    cache_key,
+    dumps,
+    loads,
+)
+from fixerio_for_pdr.tests.conftest import MockResponse
+
+TEST_API_KEY = "af3f0000fffefddc5d48f5879c0fefe"  # Not a real key
+
+RESPONSE = {
+    "success": True,
+    "timestamp": 1620189484,
+    "historical": True,
+    "base": "EUR",
+    "date": "2021-05-04",
+    "rates": {"AUD": 1.554834, "EUR": 1, "GBP": 0.864531},
+}
+
+
+@pytest.fixture
+def api_calls(mock_api):
+    """
+    Serve RESPONSE, with the requested date, and record each call.
+    """
+    return mock_api(lambda url, params: dict(RESPONSE, date=url.rsplit("/", 1)[-1]))
+
+
+class MemcachedStandIn(socketserver.StreamRequestHandler):
+    """
+    Minimal server of the memcached get and set commands, ignoring expiry.
+    """
+
+    def handle(self):
+        values = self.server.values
+        for line in self.rfile:
+            command = line.split()
+            if command[0] == b"get":
+                for key in command[1:]:
+                    if key in values:
+                        self.wfile.write(
+                            b"VALUE %s 0 %d\r\n%s\r\n"
+                            % (key, len(values[key]), values[key])
+                        )
+                self.wfile.write(b"END\r\n")
+            elif command[0] == b"set":
+                data = self.rfile.read(int(command[4]) + 2)[:-2]
+                values[command[1]] = data
+                self.server.ttls[command[1]] = int(command[3])
+                self.wfile.write(b"STORED\r\n")
+
+
+@pytest.fixture
+def memcached_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), MemcachedStandIn)
+    server.daemon_threads = True
+    server.values = {}
+    server.ttls = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestFixerCache(object):
+    """
+    Test the cache backends and their use by Fixer readers
+    """
+
+    def test_encoding_round_trip(self):
+        """
+        GIVEN a rates response
+        WHEN it is encoded and decoded
+        THEN the decoded response equals the original
+        """
+        data = dumps(RESPONSE)
+        assert loads(data) == RESPONSE
+        assert len(data) < len(str(RESPONSE))
+
+    def test_memory_cache_expires_values(self, monkeypatch):
+        """
+        GIVEN a value cached for 10 seconds
+        WHEN it is read before and after 10 seconds
+        THEN it is only returned before expiry
+        """
+        cache = MemoryCache()
+        cache.set("key", b"value", ttl=10)
+        cache.set("other", b"other")
+        assert cache.get_many(["key", "other", "missing"]) == {
+            "key": b"value",
+            "other": b"other",
+        }
+        now = datetime.utcnow().timestamp()
+        monkeypatch.setattr("time.time", lambda: now + 11)
+        assert cache.get("key") is None
+        assert cache.get("other") == b"other"
+
+    def test_file_cache_is_shared_between_instances(self, tmp_path):
+        """
+        GIVEN a value set in a file cache
+        WHEN another file cache on the same directory reads it
+        THEN the value is returned
+        """
+        FileCache(str(tmp_path)).set("key", b"value")
+        assert FileCache(str(tmp_path)).get("key") == b"value"
+        assert FileCache(str(tmp_path)).get("missing") is None
+
+    def test_undecodable_value_is_a_miss(self, api_calls, tmp_path):
+        """
+        GIVEN a file cache holding a truncated and a foreign value for
+        the requests of a reader and a client
+        WHEN they read the rates
+        THEN the API is called and the values replaced by its responses
+        """
+        cache = FileCache(str(tmp_path))
+        url = FIXERIO_BASE_URL + "2021-05-04"
+        reader_key = cache_key(url, {"symbols": "AUD"})
+        client_key = cache_key(url, {})
+        cache.set(reader_key, dumps(RESPONSE)[:-3])
+        cache.set(client_key, b"foreign value")
+        with open(cache._path("truncated"), "wb") as f:
+            f.write(b"\0")
+        assert cache.get("truncated") is None
+        with pytest.raises(ValueError):
+            loads(dumps(RESPONSE)[:-3])
+
+        df = FixerForexReader(
+            symbols="AUD", start="2021-05-04", api_key=TEST_API_KEY, cache=cache
+        ).read()
+        assert df.loc["AUD", "ExRate"] == RESPONSE["rates"]["AUD"]
+
+        class MockSession(object):
+            def get(self, url, params=None, timeout=None):
+                api_calls.append((url, params))
+                return MockResponse(RESPONSE)
+
+        client = FixerClient(api_key=TEST_API_KEY, session=MockSession(), cache=cache)
+        assert client.get_rates("2021-05-04", raw=True)["AUD"] == 1.554834
+        assert len(api_calls) == 2
+        assert loads(cache.get(reader_key)) == RESPONSE
+        assert loads(cache.get(client_key)) == RESPONSE
+
+    def test_memcached_cache_batch_get(self, memcached_server):
+        """
+        GIVEN values set through the memcached protocol
+        WHEN they are read in one batch
+        THEN the values found are returned by key
+        """
+        cache = MemcachedCache(*memcached_server.server_address)
+        cache.set("first key", b"one\r\ntwo", ttl=60)
+        cache.set("second key", b"two")
+        assert cache.get_many(["first key", "second key", "missing"]) == {
+            "first key": b"one\r\ntwo",
+            "second key": b"two",
+        }
+        assert sorted(memcached_server.ttls.values()) == [0, 60]
+        cache.close()
+
+    def test_memcached_cache_unavailable_is_a_miss(self):
+        """
+        GIVEN no server listening on the memcached address
+        WHEN a value is set and read
+        THEN no exception is raised and the value is missing
+        """
+        cache = MemcachedCache("127.0.0.1", 1, timeout=0.1)
+        cache.set("key", b"value")
+        assert cache.get("key") is None
+
+    def test_reader_uses_cache(self, api_calls, memcached_server):
+        """
+        GIVEN two readers for the same date sharing a network cache
+        WHEN both read the rates
+        THEN the API is called once and both return the same rates
+        """
+        first = FixerForexReader(
+            symbols="AUD",
+            start="2021-05-04",
+            api_key=TEST_API_KEY,
+            cache=MemcachedCache(*memcached_server.server_address),
+        ).read()
+        second = FixerForexReader(
+            symbols="AUD",
+            start="2021-05-04",
+            api_key="another key",
+            cache=MemcachedCache(*memcached_server.server_address),
+        ).read()
+        assert len(api_calls) == 1
+        assert first.equals(second)
+        assert list(memcached_server.ttls.values()) == [0]
+
+    def test_current_day_is_cached_with_ttl(self, api_calls):
+        """
+        GIVEN a reader for the current UTC day with a cache
+        WHEN the rates are read
+        THEN the response is cached for cache_ttl seconds
+        """
+        ttls = []
+
+        class RecordingCache(MemoryCache):
+            def set(self, key, value, ttl=None, timeout=None):
+                ttls.append(ttl)
+                super(RecordingCache, self).set(key, value, ttl, timeout)
+
+        FixerForexReader(
+            symbols="AUD", api_key=TEST_API_KEY, cache=RecordingCache(), cache_ttl=60
+        ).read()
+        assert ttls == [60]
@@ -0,0 +1,127 @@
+import time
+
+import pytest
+
+from pandas_datareader._utils import RemoteDataError
+from fixerio_for_pdr import Cassette, FixerClient, FixerForexReader
+from fixerio_for_pdr.tests.conftest import MockResponse, historical_response
+
+TEST_API_KEY = "af3f0000fffefddc5d48f5879c0fefe"  # Not a real key
+
+
+def rates_response(day):
+    return historical_response(day, {"AUD": 1.5 + int(day[-2:]) / 100})
+
+
+@pytest.fixture
+def api_calls(mock_api):
+    """
+    Serve an AUD rate derived from the day of month, recording each call.
+    """
+    return mock_api(lambda url, params: rates_response(url.rsplit("/", 1)[-1]))
+
+
+def read(day, cassette, api_key=TEST_API_KEY):
+    return FixerForexReader(
+        symbols="AUD", start=day, api_key=api_key, cassette=cassette
+    ).read()
+
+
+class TestFixerCassette(object):
+    """
+    Test record and replay of responses using mock api endpoint
+    """
+
+    def test_replay_recorded_responses_without_network(self, tmp_path, api_calls):
+        """
+        GIVEN responses recorded to a cassette
+        WHEN the same requests are replayed with another API key
+        THEN the recorded rates are returned without calling the API
+        """
+        path = str(tmp_path / "fixer.cassette")
+        with Cassette(path, mode="record") as cassette:
+            recorded = [read(day, cassette) for day in ("2021-05-03", "2021-05-04")]
+        assert len(api_calls) == 2
+        with open(path, "rb") as f:
+            assert TEST_API_KEY.encode("ascii") not in f.read()
+
+        with Cassette(path) as cassette:
+            assert len(cassette) == 2
+            replayed = [
+                read(day, cassette, "another key")
+                for day in ("2021-05-03", "2021-05-04")
+            ]
+        assert len(api_calls) == 2
+        for expected, df in zip(recorded, replayed):
+            assert expected.equals(df)
+
+    def test_replay_of_unrecorded_request_raises_exception(self, tmp_path, api_calls):
+        """
+        GIVEN a cassette without the response of a request
+        WHEN the request is replayed
+        THEN the RemoteDataError exception must be raised
+        """
+        path = str(tmp_path / "fixer.cassette")
+        with Cassette(path, mode="record") as cassette:
+            read("2021-05-03", cassette)
+        with Cassette(path) as cassette, pytest.raises(RemoteDataError):
+            read("2021-05-04", cassette)
+        assert len(api_calls) == 1
+
+    def test_recording_adds_to_existing_cassette(self, tmp_path, api_calls):
+        """
+        GIVEN a cassette with a recorded response
+        WHEN another response is recorded
+        THEN both responses can be replayed
+        """
+        path = str(tmp_path / "fixer.cassette")
+        with Cassette(path, mode="record") as cassette:
+            read("2021-05-03", cassette)
+        with Cassette(path, mode="record") as cassette:
+            read("2021-05-04", cassette)
+        with Cassette(path) as cassette:
+            assert len(cassette) == 2
+            assert read("2021-05-03", cassette).loc["AUD", "ExRate"] == 1.53
+
+    def test_replay_latency(self, tmp_path, api_calls):
+        """
+        GIVEN a cassette replaying with 50ms latency
+        WHEN a request is replayed
+        THEN the response takes at least 50ms
+        """
+        path = str(tmp_path / "fixer.cassette")
+        with Cassette(path, mode="record") as cassette:
+            read("2021-05-03", cassette)
+        with Cassette(path, latency=0.05) as cassette:
+            started = time.monotonic()
+            read("2021-05-03", cassette)
+            assert time.monotonic() - started >= 0.05
+
+    def test_large_cassette_opens_quickly(self, tmp_path):
+        """
+        GIVEN a cassette of 5000 responses recorded by a client
+        WHEN the cassette is opened and a response replayed
+        THEN opening reads the index only and takes well under a second
+        """
+
+        class MockSession(object):
+            def get(self, url, params=None, timeout=None):
+                return MockResponse(rates_response(url.rsplit("/", 1)[-1][:10]))
+
+        path = str(tmp_path / "fixer.cassette")
+        with Cassette(path, mode="record") as cassette:
+            client = FixerClient(
+                api_key=TEST_API_KEY, session=MockSession(), cassette=cassette
+            )
+            for i in range(5000):
+                client.get_rates(
+                    "2021-05-{:02d}".format(i % 28 + 1), "AUD", base=str(i)
+                )
+
+        started = time.monotonic()
+        with Cassette(path) as cassette:
+            assert time.monotonic() - started < 0.5
+            assert len(cassette) == 5000
+            client = FixerClient(api_key=TEST_API_KEY, session=None, cassette=cassette)
+            df = client.get_rates("2021-05-04", "AUD", base="3")
+        assert df.loc["AUD", "ExRate"] == 1.54
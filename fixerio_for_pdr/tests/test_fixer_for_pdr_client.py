@@ -0,0 +1,159 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from pandas.testing import assert_index_equal
+import pytest
+import requests
+
+from pandas_datareader._utils import RemoteDataError
+from fixerio_for_pdr import FixerClient, MemoryCache, RateLimiter
+from fixerio_for_pdr.tests.conftest import MockResponse
+
+TEST_API_KEY = "af3f0000fffefddc5d48f5879c0fefe"  # Not a real key
+
+
+class MockSession(object):
+    """
+    Session serving an AUD rate derived from the day of month of the
+    requested date, recording each request.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        with self._lock:
+            self.requests.append((url, dict(params)))
+        day = url.rsplit("/", 1)[-1]
+        if day == "timeseries":
+            days = pd.date_range(params["start_date"], params["end_date"])
+            return MockResponse(
+                {
+                    "success": True,
+                    "timeseries": True,
+                    "rates": {
+                        d.strftime("%Y-%m-%d"): {"AUD": 1.5 + d.day / 100} for d in days
+                    },
+                }
+            )
+        if params.get("symbols") == "XXX":
+            return MockResponse(
+                {"success": False, "error": {"code": 202, "type": "invalid"}}
+            )
+        return MockResponse(
+            {
+                "success": True,
+                "historical": True,
+                "base": params.get("base", "EUR"),
+                "date": day,
+                "rates": {"AUD": 1.5 + int(day[-2:]) / 100, "USD": 1.2},
+            }
+        )
+
+    def close(self):
+        pass
+
+
+class TestFixerClient(object):
+    """
+    Test the reusable fixer client using a mock session
+    """
+
+    def test_get_rates_for_date(self):
+        """
+        GIVEN a client
+        WHEN the rates of a date are requested
+        THEN a dataframe like the FixerForexReader one is returned
+        """
+        session = MockSession()
+        client = FixerClient(api_key=TEST_API_KEY, session=session)
+        df = client.get_rates("2021-05-04", ["USD", "AUD"], base="EUR")
+        assert_index_equal(df.index, pd.Index(["AUD", "USD"]))
+        assert list(df.columns) == ["Date", "ExRate"]
+        assert df.iloc[0]["Date"] == pd.Timestamp("2021-05-04")
+        assert df.loc["AUD", "ExRate"] == pytest.approx(1.54)
+        url, params = session.requests[0]
+        assert url == "http://data.fixer.io/api/2021-05-04"
+        assert params == {
+            "access_key": TEST_API_KEY,
+            "base": "EUR",
+            "symbols": "USD,AUD",
+        }
+
+    def test_invalid_symbols_raise_exception(self):
+        """
+        GIVEN a client
+        WHEN the rates of an invalid currency code are requested
+        THEN the RemoteDataError exception must be raised
+        """
+        client = FixerClient(api_key=TEST_API_KEY, session=MockSession())
+        with pytest.raises(RemoteDataError):
+            client.get_rates("2021-05-04", "XXX")
+
+    def test_failed_requests_are_retried(self):
+        """
+        GIVEN a session failing every request
+        WHEN rates are requested with 2 retries
+        THEN 3 requests are made and RemoteDataError is raised
+        """
+        attempts = []
+
+        class FailingSession(MockSession):
+            def get(self, url, params=None, timeout=None):
+                attempts.append(url)
+                raise requests.exceptions.ConnectionError("refused")
+
+        client = FixerClient(
+            api_key=TEST_API_KEY, session=FailingSession(), retry_count=2, pause=0
+        )
+        with pytest.raises(RemoteDataError):
+            client.get_rates("2021-05-04")
+        assert len(attempts) == 3
+
+    def test_client_is_shared_between_threads(self):
+        """
+        GIVEN a client with a cache shared by many threads
+        WHEN each thread requests the rates of one of 10 dates
+        THEN each thread receives the rates of its date and most
+        requests are answered by the cache
+        """
+        session = MockSession()
+        client = FixerClient(api_key=TEST_API_KEY, session=session, cache=MemoryCache())
+        days = [
+            pd.Timestamp("2021-05-01") + pd.Timedelta(days=i % 10) for i in range(200)
+        ]
+        client.get_rates(days[0], "AUD")
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            frames = list(executor.map(lambda day: client.get_rates(day, "AUD"), days))
+        for day, df in zip(days, frames):
+            assert df.iloc[0]["Date"] == day
+            assert df.loc["AUD", "ExRate"] == pytest.approx(1.5 + day.day / 100)
+        assert len(session.requests) <= 10 + 16
+
+    def test_get_timeseries(self):
+        """
+        GIVEN a client
+        WHEN the rates between two dates are requested
+        THEN one request is made and the rates of each date are returned
+        """
+        session = MockSession()
+        client = FixerClient(api_key=TEST_API_KEY, session=session)
+        df = client.get_timeseries("2021-05-01", "2021-05-03", "AUD")
+        assert len(session.requests) == 1
+        assert list(df["Date"]) == list(pd.date_range("2021-05-01", "2021-05-03"))
+        assert list(df["ExRate"]) == pytest.approx([1.51, 1.52, 1.53])
+
+    def test_rate_limiter_spaces_calls(self):
+        """
+        GIVEN a limiter of 50 calls per second
+        WHEN 6 calls are made
+        THEN they take at least 0.1 seconds
+        """
+        limiter = RateLimiter(50)
+        started = time.monotonic()
+        for _ in range(6):
+            limiter.acquire()
+        assert time.monotonic() - started >= 0.095
@@ -0,0 +1,252 @@
+import socketserver
+import threading
+import time
+
+import pandas as pd
+import pytest
+import requests
+
+from pandas_datareader._utils import RemoteDataError
+from fixerio_for_pdr import (
+    FIXERIO_BASE_URL,
+    Deadline,
+    DeadlineExceeded,
+    FixerClient,
+    FixerForexReader,
+    MemcachedCache,
+    MemoryCache,
+    cache_key,
+    dumps,
+)
+from fixerio_for_pdr.tests.conftest import MockResponse
+
+TEST_API_KEY = "af3f0000fffefddc5d48f5879c0fefe"  # Not a real key
+
+
+class SlowSession(requests.Session):
+    """
+    Session whose requests time out after at most delay seconds,
+    recording the timeout of each request.
+    """
+
+    def __init__(self, delay):
+        super(SlowSession, self).__init__()
+        self.delay = delay
+        self.timeouts = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.timeouts.append(timeout)
+        time.sleep(min(self.delay, timeout))
+        raise requests.exceptions.ReadTimeout(url)
+
+
+class FastSession(requests.Session):
+    def get(self, url, params=None, headers=None, timeout=None):
+        return MockResponse(
+            {
+                "success": True,
+                "timestamp": 1620189484,
+                "historical": True,
+                "base": "EUR",
+                "date": url.rsplit("/", 1)[-1],
+                "rates": {"USD": 1.2},
+            }
+        )
+
+
+class SilentMemcached(socketserver.StreamRequestHandler):
+    """
+    Server reading memcached commands without ever replying.
+    """
+
+    def handle(self):
+        for _ in self.rfile:
+            pass
+
+
+@pytest.fixture
+def silent_memcached():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SilentMemcached)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class RecordingCache(MemoryCache):
+    """
+    Memory cache recording the keys and timeout of each lookup.
+    """
+
+    def __init__(self):
+        super(RecordingCache, self).__init__()
+        self.lookups = []
+
+    def get_many(self, keys, timeout=None):
+        keys = list(keys)
+        self.lookups.append((keys, timeout))
+        return super(RecordingCache, self).get_many(keys, timeout)
+
+
+def cache_rates(cache, day, rate):
+    cache.set(
+        cache_key(FIXERIO_BASE_URL + day, {"symbols": "USD"}),
+        dumps(
+            {
+                "success": True,
+                "timestamp": 1620100000,
+                "historical": True,
+                "base": "EUR",
+                "date": day,
+                "rates": {"USD": rate},
+            }
+        ),
+    )
+
+
+def read(session, **kwargs):
+    return FixerForexReader(
+        symbols="USD",
+        start="2021-05-04",
+        api_key=TEST_API_KEY,
+        session=session,
+        retry_count=10,
+        pause=0.05,
+        **kwargs
+    ).read()
+
+
+class TestFixerDeadline(object):
+    """
+    Test deadline budgets using mock sessions
+    """
+
+    def test_deadline_bounds_retries(self):
+        """
+        GIVEN an API timing out after 0.1s and 10 retries
+        WHEN the rates are read with a 0.3s deadline and no cache
+        THEN DeadlineExceeded, a RemoteDataError, is raised within about
+        0.3s and no request waits past the deadline
+        """
+        session = SlowSession(0.1)
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            read(session, deadline=0.3)
+        elapsed = time.monotonic() - started
+        assert 0.3 <= elapsed < 0.5
+        assert issubclass(DeadlineExceeded, RemoteDataError)
+        assert len(session.timeouts) < 11
+        assert all(timeout <= 0.3 for timeout in session.timeouts)
+
+    def test_timeout_reads_the_clock_once(self, monkeypatch):
+        """
+        GIVEN a 1s deadline whose clock is read 0.5s, then 1.5s later
+        WHEN the timeout of a request is requested, at each time
+        THEN 0.5s are left, then DeadlineExceeded is raised, never a
+        timeout of 0
+        """
+        clock = iter([0.0, 0.5, 1.5])
+        monkeypatch.setattr("time.monotonic", lambda: next(clock))
+        deadline = Deadline(1)
+        assert deadline.timeout(5, "url") == 0.5
+        with pytest.raises(DeadlineExceeded):
+            deadline.timeout(5, "url")
+
+    def test_deadline_returns_freshest_cached_rates(self):
+        """
+        GIVEN cached rates of 2 and 3 days earlier
+        WHEN the deadline of a read is exceeded
+        THEN the rates of 2 days earlier are returned flagged as stale
+        """
+        cache = MemoryCache()
+        cache_rates(cache, "2021-05-01", 1.1)
+        cache_rates(cache, "2021-05-02", 1.15)
+        df = read(SlowSession(0.1), deadline=0.1, cache=cache)
+        assert df.attrs["stale"] is True
+        assert df.loc["USD", "Date"] == pd.Timestamp("2021-05-02")
+        assert df.loc["USD", "ExRate"] == 1.15
+
+        record = read(SlowSession(0.1), deadline=0.1, cache=cache, raw=True)
+        assert record.stale
+        assert record["USD"] == 1.15
+
+        with pytest.raises(DeadlineExceeded):
+            read(SlowSession(0.1), deadline=0.1, cache=cache, stale_days=1)
+
+    def test_stale_rates_are_looked_up_with_the_request(self):
+        """
+        GIVEN cached rates of the day before
+        WHEN the deadline of a read is exceeded
+        THEN the stale rates come from the single cache lookup made before
+        the request, bounded by the deadline
+        """
+        cache = RecordingCache()
+        cache_rates(cache, "2021-05-03", 1.19)
+        df = read(SlowSession(0.1), deadline=0.1, cache=cache)
+        assert df.attrs["stale"] is True
+        assert df.loc["USD", "ExRate"] == 1.19
+        [(keys, timeout)] = cache.lookups
+        assert len(keys) == 1 + 7
+        assert 0 < timeout <= 0.1
+
+    def test_deadline_bounds_cache_lookups(self, silent_memcached):
+        """
+        GIVEN a memcached server which never replies, with a 1s timeout
+        WHEN a reader and a client read rates with a 0.25s deadline
+        THEN DeadlineExceeded is raised within about 0.25s
+        """
+        cache = MemcachedCache(*silent_memcached.server_address, timeout=1.0)
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            read(SlowSession(0.1), deadline=0.25, cache=cache)
+        assert 0.25 <= time.monotonic() - started < 0.5
+
+        client = FixerClient(
+            api_key=TEST_API_KEY,
+            session=SlowSession(0.1),
+            cache=cache,
+            deadline=0.25,
+        )
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            client.get_rates("2021-05-04", "USD")
+        assert 0.25 <= time.monotonic() - started < 0.5
+        cache.close()
+
+    def test_response_within_deadline_is_fresh(self):
+        """
+        GIVEN a fast API
+        WHEN the rates are read with a deadline
+        THEN the fresh rates are returned without the stale flag
+        """
+        df = read(FastSession(), deadline=1)
+        assert df.loc["USD", "ExRate"] == 1.2
+        assert not df.attrs.get("stale", False)
+
+    def test_client_deadline(self):
+        """
+        GIVEN a client with a deadline and rates of the day before cached
+        WHEN the API times out
+        THEN the cached rates are returned flagged as stale, and
+        DeadlineExceeded is raised without cached rates
+        """
+        cache = MemoryCache()
+        cache_rates(cache, "2021-05-03", 1.19)
+        client = FixerClient(
+            api_key=TEST_API_KEY,
+            session=SlowSession(0.1),
+            cache=cache,
+            retry_count=10,
+            pause=0.05,
+            deadline=0.2,
+        )
+        df = client.get_rates("2021-05-04", "USD")
+        assert df.attrs["stale"] is True
+        assert df.loc["USD", "Date"] == pd.Timestamp("2021-05-03")
+        assert client.get_rates("2021-05-04", "USD", raw=True).stale
+
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            client.get_rates("2021-05-04", "GBP")
+        assert time.monotonic() - started < 0.4
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+import pytest
+
+from fixerio_for_pdr import DeltaHistory
+
+
+@pytest.fixture
+def rates():
+    """
+    Two years of daily rates of 20 currencies. Weekend rates repeat
+    Friday's, most currencies only change every few days and one
+    currency is missing for a month.
+    """
+    rng = np.random.RandomState(0)
+    dates = pd.date_range("2019-01-01", "2020-12-31", name="Date")
+    currencies = ["C{:02d}".format(i) for i in range(20)]
+    steps = rng.normal(0, 0.01, (len(dates), len(currencies)))
+    steps[rng.rand(*steps.shape) < 0.7] = 0
+    steps[dates.dayofweek >= 5] = 0
+    df = pd.DataFrame(np.exp(np.cumsum(steps, axis=0)), index=dates, columns=currencies)
+    df.loc["2020-03-01":"2020-03-31", "C05"] = np.nan
+    return df
+
+
+class TestDeltaHistory(object):
+    """
+    Test the delta-compressed rate history
+    """
+
+    def test_round_trip(self, rates):
+        """
+        GIVEN a frame of daily rates
+        WHEN it is encoded and decoded
+        THEN the decoded frame equals the original
+        """
+        history = DeltaHistory.from_frame(rates, keyframe_interval=8)
+        assert_frame_equal(history.to_frame(), rates, check_freq=False)
+
+    def test_random_access(self, rates):
+        """
+        GIVEN an encoded history
+        WHEN ranges starting at various records are decoded
+        THEN each range equals the original rows
+        """
+        history = DeltaHistory.from_frame(rates, keyframe_interval=8)
+        for start, end in [
+            ("2019-01-01", "2019-01-01"),
+            ("2019-06-15", "2019-06-16"),
+            ("2020-02-27", "2020-04-03"),
+            ("2020-12-31", "2021-06-01"),
+        ]:
+            expected = rates.loc[start:end]
+            assert_frame_equal(history.to_frame(start, end), expected, check_freq=False)
+        assert history.to_frame("2021-01-01", "2021-02-01").empty
+        assert list(history.to_frame(symbols="C03").columns) == ["C03"]
+
+    def test_identical_days_collapse_to_runs(self, rates):
+        """
+        GIVEN rates repeating on weekends
+        WHEN they are encoded
+        THEN weekends add no records and the encoding is smaller
+        than the raw rates
+        """
+        history = DeltaHistory.from_frame(rates)
+        weekdays = (rates.index.dayofweek < 5).sum()
+        assert len(history.record_start) <= weekdays + 1
+        assert history.nbytes < rates.values.nbytes / 2
+
+    def test_append_matches_single_encoding(self, rates):
+        """
+        GIVEN a history encoded in two appends
+        WHEN it is decoded
+        THEN it equals the history encoded at once
+        """
+        history = DeltaHistory.from_frame(rates.loc[:"2019-12-31"], keyframe_interval=8)
+        history.append(rates.loc["2020-01-01":])
+        single = DeltaHistory.from_frame(rates, keyframe_interval=8)
+        assert_frame_equal(history.to_frame(), single.to_frame())
+        np.testing.assert_array_equal(history.keyframe, single.keyframe)
+        with pytest.raises(ValueError):
+            history.append(rates.loc["2020-12-31":])
+
+    def test_save_and_load(self, rates, tmp_path):
+        """
+        GIVEN a saved history
+        WHEN it is loaded
+        THEN the decoded frame equals the original
+        """
+        path = str(tmp_path / "eur.npz")
+        DeltaHistory.from_frame(rates).save(path)
+        loaded = DeltaHistory.load(path)
+        assert_frame_equal(
+            loaded.to_frame("2020-03-01", "2020-03-31"),
+            rates.loc["2020-03-01":"2020-03-31"],
+            check_freq=False,
+        )
@@ -0,0 +1,141 @@
+import pandas as pd
+import pytest
+
+from fixerio_for_pdr import FixerForexReader, LazyRateFrame
+from fixerio_for_pdr.tests.conftest import historical_response
+
+TEST_API_KEY = "af3f0000fffefddc5d48f5879c0fefe"  # Not a real key
+CURRENCIES = ["AUD", "CAD", "CHF", "GBP", "JPY", "USD"]
+
+
+def rate(day, currency):
+    return CURRENCIES.index(currency) + int(day[-2:]) / 100
+
+
+@pytest.fixture
+def api_calls(mock_api):
+    """
+    Serve rates derived from the currency and the day of month, recording
+    the URL and parameters of each call.
+    """
+
+    def respond(url, params):
+        day = url.rsplit("/", 1)[-1]
+        symbols = params.get("symbols")
+        symbols = symbols.split(",") if symbols else CURRENCIES
+        return historical_response(day, {c: rate(day, c) for c in symbols})
+
+    return mock_api(respond)
+
+
+def lazy_frame(**kwargs):
+    kwargs.setdefault("symbols", CURRENCIES)
+    kwargs.setdefault("block_days", 10)
+    kwargs.setdefault("block_symbols", 2)
+    return LazyRateFrame("2021-01-01", "2021-12-31", api_key=TEST_API_KEY, **kwargs)
+
+
+class TestLazyRateFrame(object):
+    """
+    Test the lazily fetched rate frame using mock api endpoint
+    """
+
+    def test_nothing_fetched_until_sliced(self, api_calls):
+        """
+        GIVEN a lazy frame of a year of six currencies
+        WHEN its shape is read
+        THEN no API call is made
+        """
+        frame = lazy_frame()
+        assert frame.shape == (365, 6)
+        assert api_calls == []
+
+    def test_slice_fetches_touched_blocks_only(self, api_calls):
+        """
+        GIVEN a lazy frame in blocks of 10 days by 2 currencies
+        WHEN 5 days of one currency are sliced twice
+        THEN only the block holding them is fetched, once
+        """
+        frame = lazy_frame()
+        df = frame.loc["2021-05-03":"2021-05-07", "CHF"]
+        assert list(df.index) == list(pd.date_range("2021-05-03", "2021-05-07"))
+        assert df["2021-05-04"] == rate("2021-05-04", "CHF")
+        assert len(api_calls) == 10
+        assert set(params.get("symbols") for _, params in api_calls) == {"CHF,GBP"}
+
+        frame.loc["2021-05-04", ["CHF", "GBP"]]
+        assert len(api_calls) == 10
+        assert frame.fetched_blocks == 1
+
+    def test_memory_bound(self, api_calls):
+        """
+        GIVEN a lazy frame keeping at most 3 blocks
+        WHEN the whole frame is iterated
+        THEN every row is returned and at most 3 blocks are kept
+        """
+        frame = lazy_frame(max_blocks=3)
+        rows = list(frame.iterrows())
+        assert len(rows) == 365
+        day, row = rows[-1]
+        assert day == pd.Timestamp("2021-12-31")
+        assert row["USD"] == rate("2021-12-31", "USD")
+        assert len(frame._blocks) == 3
+
+    def test_aggregations(self, api_calls):
+        """
+        GIVEN a lazy frame of one month
+        WHEN it is aggregated
+        THEN the results equal those of the fetched frame
+        """
+        frame = LazyRateFrame(
+            "2021-03-01",
+            "2021-03-31",
+            symbols=CURRENCIES,
+            api_key=TEST_API_KEY,
+            block_days=7,
+            block_symbols=4,
+        )
+        df = frame.to_frame()
+        assert df.shape == (31, 6)
+        pd.testing.assert_series_equal(frame.mean(), df.mean())
+        pd.testing.assert_series_equal(frame.min(), df.min())
+        assert frame.count()["AUD"] == 31
+
+    def test_reader_returns_lazy_frame(self, api_calls):
+        """
+        GIVEN a lazy reader of all currencies
+        WHEN it is read and a date sliced
+        THEN a lazy frame is returned and only the date's block fetched
+        """
+        frame = FixerForexReader(
+            start="2021-01-01", end="2021-12-31", api_key=TEST_API_KEY, lazy=True
+        ).read()
+        assert isinstance(frame, LazyRateFrame)
+        assert api_calls == []
+        assert frame.loc["2021-06-02", "USD"] == rate("2021-06-02", "USD")
+        assert len(api_calls) == 30
+        assert list(frame.columns) == CURRENCIES
+
+    def test_slice_after_currencies_discovered(self, api_calls):
+        """
+        GIVEN a lazy frame of all currencies in blocks of 2 currencies
+        WHEN its shape is read, then dates sliced
+        THEN each currency is returned once and the block fetched for the
+        shape is reused
+        """
+        frame = LazyRateFrame(
+            "2021-01-01",
+            "2021-12-31",
+            api_key=TEST_API_KEY,
+            block_days=10,
+            block_symbols=2,
+        )
+        assert frame.shape == (365, 6)
+        assert len(api_calls) == 10
+        df = frame.loc["2021-01-02":"2021-01-03"]
+        assert list(df.columns) == CURRENCIES
+        assert df.loc["2021-01-03", "JPY"] == rate("2021-01-03", "JPY")
+        assert len(api_calls) == 10
+        df = frame.loc["2021-01-11":"2021-01-12", "GBP"]
+        assert df["2021-01-12"] == rate("2021-01-12", "GBP")
+        assert set(params.get("symbols") for _, params in api_calls[10:]) == {"CHF,GBP"}
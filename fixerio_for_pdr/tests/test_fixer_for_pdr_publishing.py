@@ -0,0 +1,179 @@
+import calendar
+import sqlite3
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from fixerio_for_pdr import (
+    LazyRateFrame,
+    Lookup,
+    PublishingCalendar,
+    RateStore,
+    read_batch,
+)
+from fixerio_for_pdr.backfill import _backfill_partition, _init_worker
+from fixerio_for_pdr.tests.conftest import historical_response
+
+TEST_API_KEY = "af3f0000fffefddc5d48f5879c0fefe"  # Not a real key
+
+
+def published(day):
+    """Latest weekday on or before day"""
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+
+def rate(day):
+    return 1 + published(day).toordinal() % 1000 / 1000
+
+
+def requested_day(url):
+    return datetime.strptime(url.rsplit("/", 1)[-1], "%Y-%m-%d").date()
+
+
+@pytest.fixture
+def api_calls(mock_api):
+    """
+    Serve a USD rate published on weekdays and repeated on weekends, with
+    the timestamp of the end of the requested day, recording the URL and
+    parameters of each call.
+    """
+
+    def respond(url, params):
+        day = requested_day(url)
+        return historical_response(
+            day.isoformat(),
+            {"USD": rate(day)},
+            timestamp=calendar.timegm(day.timetuple()) + 86399,
+        )
+
+    return mock_api(respond)
+
+
+class TestPublishingCalendar(object):
+    """
+    Test calendar-aware elision of requests using mock api endpoint
+    """
+
+    def test_configured_calendar(self):
+        """
+        GIVEN a calendar of weekdays with a holiday on Monday 2021-05-03
+        WHEN the source dates of days are requested
+        THEN weekends and the holiday are sourced from the Friday before
+        """
+        cal = PublishingCalendar(
+            weekmask="Mon Tue Wed Thu Fri", holidays=["2021-05-03"]
+        )
+        assert cal.publishes("2021-05-04")
+        assert not cal.publishes("2021-05-02")
+        assert cal.source_date("2021-05-01") == date(2021, 4, 30)
+        assert cal.source_date("2021-05-03") == date(2021, 4, 30)
+        assert cal.source_date("2021-05-05") == date(2021, 5, 5)
+        with pytest.raises(ValueError):
+            PublishingCalendar(weekmask="Mon Fun")
+
+    def test_learned_calendar(self):
+        """
+        GIVEN a learning calendar
+        WHEN it observes three repeating Saturdays, a repeating Sunday
+        with an earlier timestamp and Mondays publishing and repeating
+        THEN Saturdays only are skipped
+        """
+        cal = PublishingCalendar()
+        for saturday in ("2021-05-01", "2021-05-08", "2021-05-15"):
+            assert cal.publishes(saturday)
+            cal.observe(saturday, {"USD": 1.2}, previous={"USD": 1.2})
+        cal.observe("2021-05-02", {"USD": 1.2}, timestamp=1619827199)
+        cal.observe("2021-05-03", {"USD": 1.2}, previous={"USD": 1.2})
+        for monday in ("2021-05-10", "2021-05-17", "2021-05-24"):
+            cal.observe(monday, {"USD": 1.2}, previous={"USD": 1.3})
+        assert not cal.publishes("2021-05-22")
+        assert cal.publishes("2021-05-23")
+        assert cal.publishes("2021-05-31")
+        assert cal.source_date("2021-05-22") == date(2021, 5, 21)
+
+    def test_batch_skips_learned_weekends(self, api_calls):
+        """
+        GIVEN a learning calendar and 8 weeks of lookups
+        WHEN they are read in weekly batches
+        THEN weekends are no longer requested once learned, and their
+        forward-filled rates, marked as synthesized, equal the API's
+        """
+        cal = PublishingCalendar()
+        days = pd.date_range("2021-03-01", "2021-04-25").date
+        frames = []
+        for week in range(8):
+            lookups = [
+                Lookup(day, symbols="USD") for day in days[week * 7 : week * 7 + 7]
+            ]
+            frames.extend(read_batch(lookups, api_key=TEST_API_KEY, calendar=cal))
+        assert len(api_calls) == 3 * 7 + 5 * 5
+        assert all(requested_day(url).weekday() < 5 for url, _ in api_calls[21:])
+        for day, df in zip(days, frames):
+            assert df.loc["USD", "ExRate"] == rate(day)
+            assert df.loc["USD", "Date"] == pd.Timestamp(day)
+            assert df.attrs["synthesized"] == (day >= days[21] and day.weekday() >= 5)
+
+    def test_lazy_frame_records_synthesized_dates(self, api_calls):
+        """
+        GIVEN a lazy frame with a calendar of weekdays
+        WHEN a week is sliced
+        THEN the weekend is not requested and recorded as synthesized
+        """
+        frame = LazyRateFrame(
+            "2021-05-03",
+            "2021-05-09",
+            symbols="USD",
+            api_key=TEST_API_KEY,
+            calendar=PublishingCalendar(weekmask="Mon Tue Wed Thu Fri"),
+        )
+        df = frame.loc["2021-05-03":"2021-05-09"]
+        assert len(api_calls) == 5
+        assert df.loc["2021-05-09", "USD"] == rate(date(2021, 5, 7))
+        assert frame.synthesized_dates == {
+            pd.Timestamp("2021-05-08"),
+            pd.Timestamp("2021-05-09"),
+        }
+
+    def test_backfill_skips_weekends(self, tmp_path, api_calls):
+        """
+        GIVEN a worker with a calendar of weekdays
+        WHEN a partition from Friday to the next Friday is backfilled
+        THEN the weekend is stored as synthesized copies of Friday
+        """
+        path = str(tmp_path / "rates.sqlite")
+        _init_worker(
+            path, TEST_API_KEY, 0, 0, PublishingCalendar(weekmask="Mon Tue Wed Thu Fri")
+        )
+        _, fetched = _backfill_partition(
+            (date(2021, 5, 7), date(2021, 5, 14)), None, None
+        )
+        assert fetched == 6
+        store = RateStore(path)
+        assert store.dates(synthesized=True) == [date(2021, 5, 8), date(2021, 5, 9)]
+        df = store.read(start="2021-05-07", end="2021-05-10")
+        assert list(df["USD"]) == [rate(date(2021, 5, 7))] * 3 + [
+            rate(date(2021, 5, 10))
+        ]
+
+    def test_store_created_before_synthesized_days(self, tmp_path):
+        """
+        GIVEN a store database without the synthesized column
+        WHEN it is opened and a synthesized day written
+        THEN the column is added and the day recorded as synthesized
+        """
+        path = str(tmp_path / "rates.sqlite")
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE days (base TEXT NOT NULL, date TEXT NOT NULL,"
+            " timestamp INTEGER, PRIMARY KEY (base, date))"
+        )
+        conn.execute("INSERT INTO days VALUES ('EUR', '2021-05-07', NULL)")
+        conn.commit()
+        conn.close()
+        store = RateStore(path)
+        store.write("EUR", "2021-05-08", {"USD": 1.2}, synthesized=True)
+        assert store.dates(synthesized=False) == [date(2021, 5, 7)]
+        assert store.dates(synthesized=True) == [date(2021, 5, 8)]
@@ -0,0 +1,114 @@
+import datetime
+
+import pytest
+from pandas.testing import assert_frame_equal
+
+from fixerio_for_pdr import (
+    FixerClient,
+    FixerForexReader,
+    FixerTimeseriesReader,
+    MemoryCache,
+    RateRecord,
+)
+from fixerio_for_pdr.tests.conftest import MockResponse
+
+TEST_API_KEY = "af3f0000fffefddc5d48f5879c0fefe"  # Not a real key
+
+RATES_RESPONSE = {
+    "success": True,
+    "timestamp": 1620189484,
+    "historical": True,
+    "base": "EUR",
+    "date": "2021-05-04",
+    "rates": {"USD": 1.202053, "AUD": 1.555723, "GBP": 0.865363},
+}
+
+
+class MockSession(object):
+    def __init__(self, response):
+        self.response = response
+
+    def get(self, url, params=None, timeout=None):
+        return MockResponse(self.response)
+
+
+class TestRateRecord(object):
+    """
+    Test the raw rates result using mock api endpoint
+    """
+
+    def test_reader_returns_record(self, mock_api):
+        """
+        GIVEN a raw reader
+        WHEN it is read
+        THEN a record mapping currency to rate is returned, whose frame
+        equals the reader's DataFrame
+        """
+        mock_api(lambda url, params: RATES_RESPONSE)
+        record = FixerForexReader(
+            start="2021-05-04", api_key=TEST_API_KEY, raw=True
+        ).read()
+        assert isinstance(record, RateRecord)
+        assert record.date == datetime.date(2021, 5, 4)
+        assert record.base == "EUR"
+        assert record.timestamp == 1620189484
+        assert list(record) == ["AUD", "GBP", "USD"]
+        assert record["USD"] == 1.202053
+        assert "JPY" not in record
+        assert record.get("JPY") is None
+        with pytest.raises(KeyError):
+            record["JPY"]
+        assert dict(record) == RATES_RESPONSE["rates"]
+
+        df = FixerForexReader(start="2021-05-04", api_key=TEST_API_KEY).read()
+        assert_frame_equal(record.to_frame(), df)
+
+    def test_timeseries_reader_returns_records(self, mock_api):
+        """
+        GIVEN a raw timeseries reader
+        WHEN it is read
+        THEN a record of each date is returned in date order
+        """
+        mock_api(
+            lambda url, params: {
+                "success": True,
+                "timeseries": True,
+                "base": "EUR",
+                "rates": {"2021-05-04": {"USD": 1.2}, "2021-05-03": {"USD": 1.1}},
+            }
+        )
+        records = FixerTimeseriesReader(
+            start="2021-05-03", end="2021-05-04", api_key=TEST_API_KEY, raw=True
+        ).read()
+        assert [r.date for r in records] == [
+            datetime.date(2021, 5, 3),
+            datetime.date(2021, 5, 4),
+        ]
+        assert [r["USD"] for r in records] == [1.1, 1.2]
+
+    def test_client_returns_record(self):
+        """
+        GIVEN a client with a cache
+        WHEN raw rates are read twice
+        THEN the same record is returned from the API and from the cache
+        """
+        client = FixerClient(
+            api_key=TEST_API_KEY,
+            session=MockSession(RATES_RESPONSE),
+            cache=MemoryCache(),
+        )
+        first = client.get_rates("2021-05-04", raw=True)
+        second = client.get_rates("2021-05-04", raw=True)
+        for record in (first, second):
+            assert record.date == datetime.date(2021, 5, 4)
+            assert dict(record) == RATES_RESPONSE["rates"]
+        assert_frame_equal(first.to_frame(), client.get_rates("2021-05-04"))
+
+    def test_lazy_and_raw_raises_exception(self):
+        """
+        GIVEN a reader both lazy and raw
+        WHEN it is created
+        THEN the ValueError exception must be raised
+        """
+        with pytest.raises(ValueError):
+            FixerForexReader(api_key=TEST_API_KEY, lazy=True, raw=True)
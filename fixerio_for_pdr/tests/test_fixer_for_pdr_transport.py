@@ -0,0 +1,343 @@
+import json
+import shutil
+import socket
+import ssl
+import subprocess
+import threading
+from urllib.parse import urlsplit
+
+import pandas as pd
+import pytest
+
+import fixerio_for_pdr.transport
+from fixerio_for_pdr import (
+    FixerClient,
+    FixerForexReader,
+    HTTP2Transport,
+    Lookup,
+    RequestsTransport,
+    http2_transport,
+    read_batch,
+)
+
+TEST_API_KEY = "af3f0000fffefddc5d48f5879c0fefe"  # Not a real key
+
+
+def rates_body(path):
+    day = urlsplit(path).path.rsplit("/", 1)[-1]
+    return json.dumps(
+        {
+            "success": True,
+            "timestamp": 1620189484,
+            "historical": True,
+            "base": "EUR",
+            "date": day,
+            "rates": {"USD": 1 + int(day[-2:]) / 100},
+        }
+    ).encode("utf-8")
+
+
+class LocalTLSServer(object):
+    """
+    Local Fixer.io stand-in over TLS, speaking HTTP/2 or HTTP/1.1 as
+    negotiated with ALPN, counting connections and requests.
+    """
+
+    def __init__(self, certfile, keyfile, protocols):
+        self.context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.context.load_cert_chain(certfile, keyfile)
+        self.context.set_alpn_protocols(protocols)
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(128)
+        self.base_url = "https://127.0.0.1:{}/api/".format(self.sock.getsockname()[1])
+        self.connections = 0
+        self.requests = 0
+        self.protocols = set()
+        self._lock = threading.Lock()
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        try:
+            tls = self.context.wrap_socket(conn, server_side=True)
+        except (OSError, ssl.SSLError):
+            conn.close()
+            return
+        protocol = tls.selected_alpn_protocol() or "http/1.1"
+        with self._lock:
+            self.connections += 1
+            self.protocols.add(protocol)
+        try:
+            if protocol == "h2":
+                self._handle_h2(tls)
+            else:
+                self._handle_http11(tls)
+        except OSError:
+            pass
+        finally:
+            tls.close()
+
+    def _count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def _handle_h2(self, tls):
+        import h2.config
+        import h2.connection
+        import h2.events
+        import h2.exceptions
+
+        conn = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False, header_encoding="utf-8")
+        )
+        conn.initiate_connection()
+        tls.sendall(conn.data_to_send())
+        pending = {}
+        while True:
+            data = tls.recv(65535)
+            if not data:
+                return
+            try:
+                events = conn.receive_data(data)
+            except h2.exceptions.ProtocolError:
+                tls.sendall(conn.data_to_send())
+                return
+            for event in events:
+                if isinstance(event, h2.events.RequestReceived):
+                    self._count_request()
+                    body = rates_body(dict(event.headers)[":path"])
+                    try:
+                        conn.send_headers(
+                            event.stream_id,
+                            [
+                                (":status", "200"),
+                                ("content-type", "application/json"),
+                                ("content-length", str(len(body))),
+                            ],
+                        )
+                    except (h2.exceptions.H2Error, KeyError):
+                        continue
+                    pending[event.stream_id] = body
+                elif isinstance(event, h2.events.StreamReset):
+                    pending.pop(event.stream_id, None)
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    tls.sendall(conn.data_to_send())
+                    return
+            self._send_h2_bodies(conn, pending)
+            tls.sendall(conn.data_to_send())
+
+    def _send_h2_bodies(self, conn, pending):
+        """
+        Send as much of the pending bodies as the flow control windows
+        allow, the rest after the client's next window updates.
+        """
+        import h2.exceptions
+
+        for stream_id, body in list(pending.items()):
+            try:
+                size = min(
+                    len(body),
+                    conn.local_flow_control_window(stream_id),
+                    conn.max_outbound_frame_size,
+                )
+                if size == 0:
+                    continue
+                conn.send_data(stream_id, body[:size], end_stream=size == len(body))
+            except (h2.exceptions.H2Error, KeyError):
+                del pending[stream_id]
+                continue
+            if size == len(body):
+                del pending[stream_id]
+            else:
+                pending[stream_id] = body[size:]
+
+    def _handle_http11(self, tls):
+        buffer = b""
+        while True:
+            while b"\r\n\r\n" not in buffer:
+                data = tls.recv(65535)
+                if not data:
+                    return
+                buffer += data
+            head, buffer = buffer.split(b"\r\n\r\n", 1)
+            self._count_request()
+            body = rates_body(head.split(b" ")[1].decode("ascii"))
+            tls.sendall(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                + "Content-Length: {}\r\n\r\n".format(len(body)).encode("ascii")
+                + body
+            )
+
+    def close(self):
+        self.sock.close()
+
+
+@pytest.fixture(scope="module")
+def certificate(tmp_path_factory):
+    """
+    Self-signed certificate of 127.0.0.1, created with openssl.
+    """
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl is not installed")
+    directory = tmp_path_factory.mktemp("tls")
+    certfile = str(directory / "cert.pem")
+    keyfile = str(directory / "key.pem")
+    subprocess.run(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=127.0.0.1",
+            "-addext",
+            "subjectAltName=IP:127.0.0.1",
+            "-keyout",
+            keyfile,
+            "-out",
+            certfile,
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return certfile, keyfile
+
+
+@pytest.fixture
+def server(request, certificate):
+    """
+    Local TLS server negotiating the protocols of the test parameter.
+    """
+    server = LocalTLSServer(*certificate, protocols=request.param)
+    yield server
+    server.close()
+
+
+class TestFixerTransport(object):
+    """
+    Test the transports against a local TLS server
+    """
+
+    @pytest.mark.parametrize("server", [["h2", "http/1.1"]], indirect=True)
+    def test_http2_multiplexes_concurrent_calls(self, server, certificate):
+        """
+        GIVEN an HTTP/2 transport of at most 2 connections
+        WHEN a batch of 120 dates is read by 40 concurrent workers
+        THEN every call is answered over at most 2 HTTP/2 connections
+        """
+        pytest.importorskip("h2")
+        pytest.importorskip("httpx")
+        days = pd.date_range("2021-01-01", periods=120).date
+        with HTTP2Transport(
+            base_url=server.base_url, max_connections=2, verify=certificate[0]
+        ) as transport:
+            frames = read_batch(
+                [Lookup(day, symbols="USD") for day in days],
+                api_key=TEST_API_KEY,
+                max_workers=40,
+                transport=transport,
+            )
+            response = transport.get(server.base_url + "2021-05-04")
+            assert response.http_version == "HTTP/2"
+        for day, df in zip(days, frames):
+            assert df.loc["USD", "ExRate"] == 1 + day.day / 100
+        assert server.requests >= 121
+        assert server.connections <= 2
+        assert server.protocols == {"h2"}
+
+    @pytest.mark.parametrize("server", [["h2", "http/1.1"]], indirect=True)
+    def test_http2_stream_errors_are_retried(self, server, certificate):
+        """
+        GIVEN an HTTP/2 transport whose first two requests fail with
+        HTTP/2 stream errors
+        WHEN a batch of 3 dates is read through it
+        THEN the failed requests are retried and every rate returned
+        """
+        h2_exceptions = pytest.importorskip("h2.exceptions")
+        pytest.importorskip("httpx")
+        errors = [KeyError(59), h2_exceptions.StreamClosedError(3)]
+        with HTTP2Transport(
+            base_url=server.base_url, verify=certificate[0]
+        ) as transport:
+            get = transport.client.get
+
+            async def failing_get(*args, **kwargs):
+                if errors:
+                    raise errors.pop()
+                return await get(*args, **kwargs)
+
+            transport.client.get = failing_get
+            days = pd.date_range("2021-01-01", periods=3).date
+            frames = read_batch(
+                [Lookup(day, symbols="USD") for day in days],
+                api_key=TEST_API_KEY,
+                pause=0,
+                transport=transport,
+            )
+        assert errors == []
+        for day, df in zip(days, frames):
+            assert df.loc["USD", "ExRate"] == 1 + day.day / 100
+
+    @pytest.mark.parametrize("server", [["http/1.1"]], indirect=True)
+    def test_http2_transport_falls_back_to_http11(self, server, certificate):
+        """
+        GIVEN an HTTP/2 transport and a server speaking HTTP/1.1 only
+        WHEN a reader and a client read rates through the transport
+        THEN the rates are read over HTTP/1.1
+        """
+        pytest.importorskip("h2")
+        pytest.importorskip("httpx")
+        with HTTP2Transport(
+            base_url=server.base_url, verify=certificate[0]
+        ) as transport:
+            df = FixerForexReader(
+                symbols="USD",
+                start="2021-05-04",
+                api_key=TEST_API_KEY,
+                transport=transport,
+            ).read()
+            assert df.loc["USD", "ExRate"] == 1.04
+            client = FixerClient(api_key=TEST_API_KEY, transport=transport)
+            assert client.get_rates("2021-05-05", "USD", raw=True)["USD"] == 1.05
+            response = transport.get(server.base_url + "2021-05-04")
+            assert response.http_version == "HTTP/1.1"
+        assert server.protocols == {"http/1.1"}
+
+    @pytest.mark.parametrize("server", [["http/1.1"]], indirect=True)
+    def test_requests_transport(self, server, certificate):
+        """
+        GIVEN a requests transport rewriting the Fixer.io URL
+        WHEN a reader reads rates through it
+        THEN the rates are read from the local server
+        """
+        transport = RequestsTransport(base_url=server.base_url, verify=certificate[0])
+        df = FixerForexReader(
+            symbols="USD", start="2021-05-06", api_key=TEST_API_KEY, transport=transport
+        ).read()
+        assert df.loc["USD", "ExRate"] == 1.06
+        transport.close()
+
+    def test_fallback_without_httpx(self, monkeypatch):
+        """
+        GIVEN httpx is not installed
+        WHEN an HTTP/2 transport is requested
+        THEN a warning is issued and an HTTP/1.1 transport returned
+        """
+        monkeypatch.setattr(fixerio_for_pdr.transport, "httpx", None)
+        with pytest.warns(RuntimeWarning):
+            transport = http2_transport()
+        assert isinstance(transport, RequestsTransport)
+        with pytest.raises(ImportError):
+            HTTP2Transport()
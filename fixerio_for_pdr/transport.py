@@ -0,0 +1,227 @@
+"""
+Transports sending the HTTP requests of Fixer readers and clients.
+
+RequestsTransport sends HTTP/1.1 requests with requests, one pooled
+connection per request in flight. HTTP2Transport multiplexes concurrent
+requests as streams of a few HTTP/2 connections, using the optional httpx
+and h2 packages, installed by the http2 extra.
+"""
+import asyncio
+import ssl
+import threading
+import warnings
+
+import requests
+
+from . import FIXERIO_BASE_URL
+
+try:
+    import h2.exceptions
+    import httpcore
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+
+class Transport(object):
+    """
+    Interface of the transports, sending GET requests as
+    requests.Session.get does.
+
+    Transports are safe to share between threads, readers and clients,
+    and are closed by their owner, not by the readers using them.
+
+    Parameters
+    ----------
+    base_url : str, optional
+        URL replacing FIXERIO_BASE_URL in the requests, e.g. the HTTPS
+        endpoint https://data.fixer.io/api/ or a local mirror.
+    """
+
+    def __init__(self, base_url=None):
+        self.base_url = base_url
+
+    def _url(self, url):
+        if self.base_url and url.startswith(FIXERIO_BASE_URL):
+            return self.base_url + url[len(FIXERIO_BASE_URL) :]
+        return url
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        """
+        Send a GET request.
+
+        Returns
+        -------
+        response
+            Response providing status_code, content, text and json()
+
+        Raises
+        ------
+        requests.exceptions.RequestException
+            If the request cannot be sent or times out
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Close the connections"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RequestsTransport(Transport):
+    """
+    HTTP/1.1 transport using a requests session.
+
+    Parameters
+    ----------
+    session : Session, optional
+        requests.sessions.Session instance to be used. A session pooling
+        pool_size connections is created if not provided.
+    pool_size : int, default 10
+        Number of pooled connections of the created session.
+    base_url : str, optional
+        URL replacing FIXERIO_BASE_URL in the requests
+    verify : bool or str, default True
+        Verify the server certificate, against the CA bundle at the path
+        given if a str.
+    """
+
+    def __init__(self, session=None, pool_size=10, base_url=None, verify=True):
+        super(RequestsTransport, self).__init__(base_url)
+        self.verify = verify
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1, pool_maxsize=pool_size
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        return self.session.get(
+            self._url(url),
+            params=params,
+            headers=headers,
+            timeout=timeout,
+            verify=self.verify,
+        )
+
+    def close(self):
+        self.session.close()
+
+
+class HTTP2Transport(Transport):
+    """
+    Transport multiplexing concurrent requests over at most
+    max_connections HTTP/2 connections.
+
+    HTTP/2 is negotiated with TLS, so base_url must be an HTTPS endpoint,
+    which Fixer.io provides on paid plans. Requests fall back to HTTP/1.1
+    when the server does not negotiate HTTP/2, including all plain HTTP
+    requests.
+
+    The streams of all calling threads are sent by an asynchronous httpx
+    client running in a thread of the transport, as the synchronous
+    client opens the streams of concurrent threads out of order. Protocol
+    errors are raised as requests.exceptions.ConnectionError, so the
+    readers retry them as any other failed request.
+
+    Parameters
+    ----------
+    base_url : str, optional
+        URL replacing FIXERIO_BASE_URL in the requests, e.g.
+        https://data.fixer.io/api/
+    max_connections : int, default 4
+        Maximum number of open connections
+    verify : bool or str, default True
+        Verify the server certificate, against the CA bundle at the path
+        given if a str.
+    """
+
+    def __init__(self, base_url=None, max_connections=4, verify=True):
+        if httpx is None:
+            raise ImportError(
+                "HTTP2Transport requires the httpx and h2 packages, "
+                "install fixerio_for_pdr[http2]"
+            )
+        super(HTTP2Transport, self).__init__(base_url)
+        if isinstance(verify, str):
+            verify = ssl.create_default_context(cafile=verify)
+        self.client = httpx.AsyncClient(
+            http2=True,
+            verify=verify,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="HTTP2Transport", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        try:
+            return self._run(
+                self.client.get(
+                    self._url(url), params=params, headers=headers, timeout=timeout
+                )
+            )
+        except httpx.TimeoutException as exc:
+            raise requests.exceptions.Timeout(str(exc))
+        except (
+            httpx.HTTPError,
+            httpcore.ProtocolError,
+            httpcore.NetworkError,
+            h2.exceptions.H2Error,
+        ) as exc:
+            raise requests.exceptions.ConnectionError(str(exc))
+        except KeyError as exc:
+            # Raised by httpcore for events of a stream it already closed
+            raise requests.exceptions.ConnectionError(
+                "Unknown HTTP/2 stream {}".format(exc)
+            )
+
+    def close(self):
+        if self._loop.is_closed():
+            return
+        self._run(self.client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+def http2_transport(base_url=None, max_connections=4, verify=True, pool_size=10):
+    """
+    HTTP2Transport, or a RequestsTransport with a warning when the httpx
+    and h2 packages are not installed.
+
+    Parameters
+    ----------
+    base_url, max_connections, verify
+        See HTTP2Transport
+    pool_size : int, default 10
+        Number of pooled connections of the HTTP/1.1 fallback
+
+    Returns
+    -------
+    Transport
+    """
+    if httpx is None:
+        warnings.warn(
+            "httpx and h2 are not installed, falling back to HTTP/1.1",
+            RuntimeWarning,
+        )
+        return RequestsTransport(pool_size=pool_size, base_url=base_url, verify=verify)
+    return HTTP2Transport(
+        base_url=base_url, max_connections=max_connections, verify=verify
+    )
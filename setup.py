@@ -46,6 +46,10 @@ setup(
     packages=find_packages(exclude=["docs", "tests*"]),
     test_suite="tests",
     tests_require=tests_require,
+    extras_require={"http2": ["httpx[http2]>=0.18"]},
+    entry_points={
+        "console_scripts": ["fixerio-backfill=fixerio_for_pdr.backfill:main"],
+    },
     zip_safe=False,
     python_requires=">=3.6",
 )
\ No newline at end of file